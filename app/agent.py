@@ -5,20 +5,358 @@ Supports both OpenAI and Ollama providers
 """
 
 import os
+import asyncio
+import copy
 import json
+import re
+import functools
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-from openai import OpenAI
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 from dotenv import load_dotenv
-import ollama
 
 from app.config import config
-from app.tools.retrieve import retrieval_tool
+from app.db.chroma import chroma_client
+from app.tools.retrieve import get_openai_client, retrieval_tool
 from app.tools.metadata import metadata_query_tool
 
+# Prefer orjson's C parser/serializer when available; tool arguments and
+# responses are small but parsed on every tool call
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+except ImportError:
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj)
+
 load_dotenv()
 
 
+@functools.cache
+def get_ollama_client() -> "ollama.Client":
+    """Shared Ollama client, constructed once per process (deferred import)"""
+    import ollama
+
+    return ollama.Client(host=config.OLLAMA_BASE_URL)
+
+
+# Queries where raw metadata tool output is already the answer
+_RAW_RESPONSE_INTENT = re.compile(
+    r"\b(list|show|what)\b.*\b(documents?|docs?|files?)\b", re.IGNORECASE
+)
+
+# System prompt loaded once at import time
+_PROMPT_PATH = Path("prompts/system.txt")
+SYSTEM_PROMPT = (
+    _PROMPT_PATH.read_text()
+    if _PROMPT_PATH.exists()
+    else "You are an AI document assistant."
+)
+
+# Tool schema shared by all agent instances
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "search_documents",
+            "description": "Search the document database for relevant information. Use this to answer questions about the uploaded documents.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "The search query to find relevant information"
+                    },
+                    "n_results": {
+                        "type": "integer",
+                        "description": "Number of results to retrieve (default: 5)",
+                        "default": 5
+                    }
+                },
+                "required": ["query"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "list_documents",
+            "description": "List all documents that have been uploaded. Use this to see what data is available.",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_document_info",
+            "description": "Get detailed information about a specific document, including sections and metadata.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "filename": {
+                        "type": "string",
+                        "description": "Name of the file to get information about"
+                    }
+                },
+                "required": ["filename"]
+            }
+        }
+    }
+]
+
+
+class SemanticResponseCache:
+    """
+    In-memory semantic cache for agent responses
+    Returns a cached answer when a new query embeds close enough to a
+    previous one, avoiding repeated LLM and retrieval round-trips
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: int = 300,
+        max_entries: int = 128
+    ):
+        """
+        Initialize the semantic cache
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Seconds before a cached entry expires
+            max_entries: Maximum number of entries to keep in memory
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Embeddings as one (N, D) float32 matrix with precomputed row
+        # norms, so lookup is a single BLAS matrix-vector product instead
+        # of a Python loop over entries
+        self._embeddings: Optional[np.ndarray] = None
+        self._norms: Optional[np.ndarray] = None
+        # Per-row bookkeeping: (history_hash, timestamp, response)
+        self._meta: List[Tuple[str, float, Dict]] = []
+
+    def clear(self):
+        """Drop every cached response (e.g. after the collection mutates)"""
+        self._embeddings = None
+        self._norms = None
+        self._meta = []
+
+    def _compact(self, keep: np.ndarray):
+        """Drop rows where keep is False, keeping arrays and meta aligned"""
+        if keep.any():
+            self._embeddings = self._embeddings[keep]
+            self._norms = self._norms[keep]
+            self._meta = [m for m, k in zip(self._meta, keep) if k]
+        else:
+            self._embeddings = None
+            self._norms = None
+            self._meta = []
+
+    @staticmethod
+    def hash_history(conversation_history: List[Dict] = None) -> str:
+        """Hash the conversation history so cached answers don't leak across contexts"""
+        if not conversation_history:
+            return ""
+        serialized = json.dumps(conversation_history, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def get(self, embedding: List[float], history_hash: str) -> Optional[Dict]:
+        """
+        Look up a cached response for a query embedding
+
+        Args:
+            embedding: Embedding of the incoming user message
+            history_hash: Hash of the conversation history
+
+        Returns:
+            Cached response dictionary, or None on miss
+        """
+        if self._embeddings is None:
+            return None
+
+        # Drop expired entries
+        now = time.time()
+        keep = np.fromiter(
+            (now - ts <= self.ttl_seconds for _, ts, _ in self._meta),
+            dtype=bool,
+            count=len(self._meta)
+        )
+        if not keep.all():
+            self._compact(keep)
+        if self._embeddings is None:
+            return None
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return None
+
+        # Vectorized cosine similarity across all cached embeddings
+        denom = self._norms * query_norm
+        similarities = np.divide(
+            self._embeddings @ query,
+            denom,
+            out=np.zeros(len(self._meta), dtype=np.float32),
+            where=denom > 0
+        )
+
+        # Only entries from the same conversation context are eligible
+        context_match = np.fromiter(
+            (meta[0] == history_hash for meta in self._meta),
+            dtype=bool,
+            count=len(self._meta)
+        )
+        similarities = np.where(context_match, similarities, -1.0)
+
+        best = int(similarities.argmax())
+        if similarities[best] >= self.similarity_threshold:
+            return self._meta[best][2]
+
+        return None
+
+    def set(self, embedding: List[float], history_hash: str, response: Dict):
+        """
+        Store a response in the cache
+
+        Args:
+            embedding: Embedding of the user message
+            history_hash: Hash of the conversation history
+            response: The agent response dictionary to cache
+        """
+        row = np.asarray(embedding, dtype=np.float32)[np.newaxis, :]
+
+        if self._embeddings is None:
+            self._embeddings = row
+            self._norms = np.linalg.norm(row, axis=1)
+        else:
+            self._embeddings = np.vstack((self._embeddings, row))
+            self._norms = np.append(self._norms, np.linalg.norm(row))
+
+        self._meta.append((history_hash, time.time(), response))
+
+        # Evict oldest entries beyond capacity
+        if len(self._meta) > self.max_entries:
+            self._embeddings = self._embeddings[-self.max_entries:]
+            self._norms = self._norms[-self.max_entries:]
+            self._meta = self._meta[-self.max_entries:]
+
+
+class LLMCache:
+    """
+    Disk-backed exact-match cache for chat completion responses
+    Identical prompts (same model + messages + tools) return the stored
+    assistant message without a round-trip to the API
+    """
+
+    def __init__(self, cache_dir: str = "./data/llm_cache"):
+        """
+        Initialize the LLM cache
+
+        Args:
+            cache_dir: Directory for the sqlite cache database
+        """
+        cache_path = Path(cache_dir)
+        cache_path.mkdir(parents=True, exist_ok=True)
+        self._db_path = cache_path / "llm_cache.db"
+        self.hits = 0
+        self.misses = 0
+        self._init_db()
+
+    def _init_db(self):
+        """Create the cache table if it doesn't exist"""
+        with sqlite3.connect(self._db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, response TEXT, created_at REAL)"
+            )
+
+    @staticmethod
+    def make_key(model: str, messages: List, tools_key: str = "") -> str:
+        """
+        Build a deterministic cache key from the request payload
+
+        Args:
+            model: Model name
+            messages: Message list sent to the API
+            tools_key: Pre-serialized tool schema (so the schema isn't
+                       re-walked and re-serialized on every call)
+
+        Returns:
+            Hex digest key string
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "tools": tools_key
+        }
+        serialized = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached response dictionary, or None on miss
+        """
+        with sqlite3.connect(self._db_path) as conn:
+            row = conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row:
+            self.hits += 1
+            return json.loads(row[0])
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, response: Dict):
+        """
+        Store a response in the cache
+
+        Args:
+            key: Cache key from make_key()
+            response: Serializable response dictionary
+        """
+        with sqlite3.connect(self._db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(response), time.time())
+            )
+
+    def stats(self) -> Dict:
+        """Get cache hit/miss statistics"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
 class RAGAgent:
     """
     AI Agent for querying the document database
@@ -26,110 +364,329 @@ class RAGAgent:
     Supports both OpenAI and Ollama providers
     """
 
-    def __init__(self):
-        """Initialize the RAG Agent"""
+    def __init__(self, search_tool_name: str = "search_documents", default_system_prompt: str = None):
+        """
+        Initialize the RAG Agent
+
+        Args:
+            search_tool_name: Name exposed to the model for the search tool,
+                              so variants (e.g. a lab-notebook assistant) can
+                              reuse this class instead of duplicating it
+            default_system_prompt: Override for the default system prompt
+        """
         llm_config = config.get_llm_config()
         self.provider = llm_config["provider"]
 
         if self.provider == "openai":
-            self.client = OpenAI(api_key=llm_config["api_key"])
+            self.client = get_openai_client()
             self.model = llm_config["model"]
         else:  # ollama
-            self.ollama_client = ollama.Client(host=llm_config["base_url"])
+            self.ollama_client = get_ollama_client()
             self.model = llm_config["model"]
 
-        # Load system prompt
-        prompt_path = Path("prompts/system.txt")
-        if prompt_path.exists():
-            with open(prompt_path, "r") as f:
-                self.system_prompt = f.read()
+        # O(1) tool-name dispatch instead of an if/elif chain
+        self.search_tool_name = search_tool_name
+        self._handlers = {
+            self.search_tool_name: self._handle_search,
+            "list_documents": self._handle_list,
+            "get_document_info": self._handle_info
+        }
+
+        # Embedding computed for the semantic-cache probe, reused by
+        # retrieval when the searched text matches the user message
+        self._pending_query_text = None
+        self._pending_query_embedding = None
+
+        # Semantic cache for repeated/paraphrased queries; cached
+        # answers predate any later upload, so collection mutations
+        # clear it through the Chroma mutation listener
+        self.response_cache = SemanticResponseCache()
+        chroma_client.register_listener(self._on_collection_change)
+
+        # Exact-match cache for chat completion calls
+        self.llm_cache = LLMCache()
+
+        # System prompt and tool schema are module-level constants,
+        # loaded/built once at import rather than per instantiation
+        self.system_prompt = default_system_prompt or SYSTEM_PROMPT
+
+        if search_tool_name == "search_documents":
+            self.tools = TOOLS
         else:
-            self.system_prompt = "You are an AI document assistant."
-
-        # Define available functions
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "search_documents",
-                    "description": "Search the document database for relevant information. Use this to answer questions about the uploaded documents.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The search query to find relevant information"
-                            },
-                            "n_results": {
-                                "type": "integer",
-                                "description": "Number of results to retrieve (default: 5)",
-                                "default": 5
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "list_documents",
-                    "description": "List all documents that have been uploaded. Use this to see what data is available.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_document_info",
-                    "description": "Get detailed information about a specific document, including sections and metadata.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {
-                                "type": "string",
-                                "description": "Name of the file to get information about"
-                            }
-                        },
-                        "required": ["filename"]
-                    }
-                }
-            }
-        ]
+            self.tools = copy.deepcopy(TOOLS)
+            self.tools[0]["function"]["name"] = search_tool_name
+
+        # Serialize the (stable) tool schema once; cache keys reuse this
+        # string instead of re-serializing the schema per call
+        self._tools_key = _json_dumps(self.tools)
+
+    def _on_collection_change(self, event: str, metadatas) -> None:
+        """Drop cached responses when the collection mutates"""
+        self.response_cache.clear()
 
-    def query(self, user_message: str, conversation_history: List[Dict] = None) -> Dict:
+    def query(self, user_message: str, conversation_history: List[Dict] = None, stream: bool = False):
         """
         Process a user query using the agent
 
         Args:
             user_message: The user's question
             conversation_history: Optional list of previous messages
+            stream: If True, return an iterator that yields response text
+                    chunks as they arrive; the final item yielded is the
+                    standard response dictionary
 
         Returns:
             Dictionary containing:
             - response: The agent's response text
             - sources: List of citations used
             - success: Boolean indicating if query was successful
+            When stream=True, an iterator as described above instead
+        """
+        if stream:
+            if self.provider == "openai":
+                return self._query_openai(user_message, conversation_history, stream=True)
+            else:
+                return self._query_ollama(user_message, conversation_history, stream=True)
+
+        # Probe the semantic cache before hitting the LLM pipeline
+        history_hash = SemanticResponseCache.hash_history(conversation_history)
+        query_embedding = None
+        try:
+            query_embedding = self._embed_message(user_message)
+            cached = self.response_cache.get(query_embedding, history_hash)
+            if cached is not None:
+                return cached
+        except Exception:
+            # Cache is best-effort; fall through to the normal pipeline
+            query_embedding = None
+
+        # Make the probe embedding available for retrieval on the same text
+        self._pending_query_text = user_message
+        self._pending_query_embedding = query_embedding
+
+        try:
+            if self.provider == "openai":
+                result = self._query_openai(user_message, conversation_history)
+            else:
+                result = self._query_ollama(user_message, conversation_history)
+        finally:
+            self._pending_query_text = None
+            self._pending_query_embedding = None
+
+        # Cache successful responses for near-duplicate queries
+        if query_embedding is not None and result.get("success"):
+            self.response_cache.set(query_embedding, history_hash, result)
+
+        return result
+
+    def _embed_message(self, text: str) -> List[float]:
+        """
+        Generate an embedding for a message using the configured provider
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
         """
+        embedding_config = config.get_embedding_config()
+
         if self.provider == "openai":
-            return self._query_openai(user_message, conversation_history)
+            response = self.client.embeddings.create(
+                model=embedding_config["model"],
+                input=text
+            )
+            return response.data[0].embedding
+        else:  # ollama
+            response = self.ollama_client.embeddings(
+                model=embedding_config["model"],
+                prompt=text
+            )
+            return response["embedding"]
+
+    async def aquery(self, user_message: str, conversation_history: List[Dict] = None) -> Dict:
+        """
+        Async entry point for query()
+
+        The pipeline is synchronous (blocking SDK clients and local
+        Chroma), so it runs in a worker thread; async callers can await
+        several agent queries concurrently without blocking the loop
+
+        Args:
+            user_message: The user's question
+            conversation_history: Optional list of previous messages
+
+        Returns:
+            Dictionary containing response, sources, and success status
+        """
+        return await asyncio.to_thread(self.query, user_message, conversation_history)
+
+    def _execute_tool(self, tool_call) -> Tuple[str, str, str, List[str]]:
+        """
+        Execute a single tool call
+
+        Args:
+            tool_call: Tool call object from the OpenAI response
+
+        Returns:
+            Tuple of (tool_call_id, function_name, function_response, citations)
+        """
+        function_name = tool_call.function.name
+        try:
+            function_args = _json_loads(tool_call.function.arguments)
+        except ValueError:
+            function_args = {}
+
+        handler = self._handlers.get(function_name, self._handle_unknown)
+        function_response, citations = handler(function_args)
+
+        return tool_call.id, function_name, function_response, citations
+
+    def _handle_search(self, function_args: Dict) -> Tuple[str, List[str]]:
+        """Handle a search tool call, returning (response, citations)"""
+        query = function_args.get("query")
+
+        # Reuse the semantic-cache probe embedding when the model searches
+        # for the user's message verbatim, saving one embedding API call
+        query_embedding = None
+        if query == self._pending_query_text:
+            query_embedding = self._pending_query_embedding
+
+        result = retrieval_tool.retrieve(
+            query=query,
+            n_results=function_args.get("n_results", 5),
+            query_embedding=query_embedding
+        )
+        function_response = retrieval_tool.format_context_for_agent(result)
+
+        citations = []
+        if result.get("success") and result.get("citations"):
+            citations = result["citations"]
+
+        return function_response, citations
+
+    def _handle_list(self, function_args: Dict) -> Tuple[str, List[str]]:
+        """Handle a list_documents tool call, returning (response, citations)"""
+        result = metadata_query_tool.list_indexed_files()
+        return metadata_query_tool.format_file_list(result), []
+
+    def _handle_info(self, function_args: Dict) -> Tuple[str, List[str]]:
+        """Handle a get_document_info tool call, returning (response, citations)"""
+        result = metadata_query_tool.get_file_info(
+            filename=function_args.get("filename")
+        )
+        # JSON is cheaper to produce than repr() and cleaner for the model
+        return _json_dumps(result), []
+
+    def _handle_unknown(self, function_args: Dict) -> Tuple[str, List[str]]:
+        """Fallback for tool names without a registered handler"""
+        return "Unknown function", []
+
+    def _execute_search_batch(self, search_calls: List) -> Dict[str, Tuple[str, str, str, List[str]]]:
+        """
+        Execute several search_documents tool calls as one batched retrieval
+
+        Args:
+            search_calls: Tool calls whose function is search_documents
+
+        Returns:
+            Dictionary mapping tool_call_id to
+            (tool_call_id, function_name, function_response, citations)
+        """
+        queries = []
+        n_results_per_call = []
+
+        for tool_call in search_calls:
+            try:
+                function_args = _json_loads(tool_call.function.arguments)
+            except ValueError:
+                function_args = {}
+
+            queries.append(function_args.get("query") or "")
+            n_results_per_call.append(function_args.get("n_results", 5))
+
+        # Chroma applies a single n_results to the whole batch, so query
+        # with the largest request and trim per call afterwards
+        batch_results = retrieval_tool.retrieve_batch(
+            queries=queries,
+            n_results=max(n_results_per_call)
+        )
+
+        results_by_id = {}
+        for tool_call, result, n_results in zip(search_calls, batch_results, n_results_per_call):
+            if result.get("success"):
+                result = {
+                    **result,
+                    "chunks": result["chunks"][:n_results],
+                    "metadatas": result["metadatas"][:n_results],
+                    "citations": result["citations"][:n_results],
+                    "distances": result["distances"][:n_results]
+                }
+
+            function_response = retrieval_tool.format_context_for_agent(result)
+            citations = result.get("citations", []) if result.get("success") else []
+
+            results_by_id[tool_call.id] = (
+                tool_call.id, self.search_tool_name, function_response, citations
+            )
+
+        return results_by_id
+
+    def _chat_completion(self, messages: List, use_tools: bool = False) -> "ChatCompletionMessage":
+        """
+        Call the OpenAI chat completions API with an exact-prompt cache
+
+        Calls are pinned to temperature=0: the API default (1.0) samples
+        non-deterministically, which is not something an exact-match
+        cache should replay
+
+        Args:
+            messages: Message list for the API
+            use_tools: Whether to expose the tool schema to the model
+
+        Returns:
+            The assistant message from the completion
+        """
+        from openai.types.chat import ChatCompletionMessage
+
+        key = LLMCache.make_key(self.model, messages, self._tools_key if use_tools else "")
+
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            return ChatCompletionMessage.model_validate(cached)
+
+        if use_tools:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                tools=self.tools,
+                tool_choice="auto",
+                temperature=0
+            )
         else:
-            return self._query_ollama(user_message, conversation_history)
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0
+            )
+
+        response_message = response.choices[0].message
+        self.llm_cache.set(key, response_message.model_dump(exclude_none=True))
+
+        return response_message
 
-    def _query_openai(self, user_message: str, conversation_history: List[Dict] = None) -> Dict:
+    def _query_openai(self, user_message: str, conversation_history: List[Dict] = None, stream: bool = False):
         """
         Process a user query using OpenAI
 
         Args:
             user_message: The user's question
             conversation_history: Optional list of previous messages
+            stream: If True, stream the final completion as an iterator
 
         Returns:
-            Dictionary containing response, sources, and success status
+            Dictionary containing response, sources, and success status,
+            or an iterator of text chunks when stream=True
         """
         try:
             # Build messages
@@ -143,55 +700,49 @@ class RAGAgent:
             messages.append({"role": "user", "content": user_message})
 
             # Call OpenAI with function calling
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=self.tools,
-                tool_choice="auto"
-            )
-
-            response_message = response.choices[0].message
+            response_message = self._chat_completion(messages, use_tools=True)
             tool_calls = response_message.tool_calls
 
-            # Track sources/citations
-            all_citations = []
+            # Track sources/citations (dict keys give order-preserving dedup)
+            all_citations = {}
 
             # If the model wants to call functions
             if tool_calls:
                 # Extend conversation with assistant's response
                 messages.append(response_message)
 
-                # Process each tool call
+                # Batch multiple search_documents calls into one embedding +
+                # ChromaDB round-trip; run any remaining calls concurrently
+                # since they are independent and I/O-bound
+                results_by_id = {}
+
+                search_calls = [
+                    tc for tc in tool_calls
+                    if tc.function.name == self.search_tool_name
+                ]
+
+                if len(search_calls) > 1:
+                    results_by_id.update(self._execute_search_batch(search_calls))
+                    remaining = [
+                        tc for tc in tool_calls
+                        if tc.function.name != self.search_tool_name
+                    ]
+                else:
+                    remaining = list(tool_calls)
+
+                if len(remaining) > 1:
+                    with ThreadPoolExecutor(max_workers=len(remaining)) as executor:
+                        for result in executor.map(self._execute_tool, remaining):
+                            results_by_id[result[0]] = result
+                elif remaining:
+                    result = self._execute_tool(remaining[0])
+                    results_by_id[result[0]] = result
+
+                # Append responses in the original tool_call order
+                # (OpenAI requires tool messages to match the call order)
                 for tool_call in tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = eval(tool_call.function.arguments)
-
-                    # Execute the appropriate function
-                    if function_name == "search_documents":
-                        result = retrieval_tool.retrieve(
-                            query=function_args.get("query"),
-                            n_results=function_args.get("n_results", 5)
-                        )
-                        function_response = retrieval_tool.format_context_for_agent(result)
-
-                        # Collect citations
-                        if result.get("success") and result.get("citations"):
-                            all_citations.extend(result["citations"])
-
-                    elif function_name == "list_documents":
-                        result = metadata_query_tool.list_indexed_files()
-                        function_response = metadata_query_tool.format_file_list(result)
-
-                    elif function_name == "get_document_info":
-                        result = metadata_query_tool.get_file_info(
-                            filename=function_args.get("filename")
-                        )
-                        function_response = str(result)
-
-                    else:
-                        function_response = "Unknown function"
-
-                    # Add function response to messages
+                    _, function_name, function_response, citations = results_by_id[tool_call.id]
+                    all_citations.update(dict.fromkeys(citations))
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
@@ -199,23 +750,50 @@ class RAGAgent:
                         "content": function_response
                     })
 
+                # Fast path: when every call was a metadata lookup and the
+                # user plainly asked for that metadata, the raw tool output
+                # already answers the question - skip the second LLM call
+                if (config.RAW_TOOL_RESPONSE_SHORTCUT
+                        and _RAW_RESPONSE_INTENT.search(user_message)
+                        and all(tc.function.name in ("list_documents", "get_document_info")
+                                for tc in tool_calls)):
+                    final_response = "\n\n".join(
+                        results_by_id[tc.id][2] for tc in tool_calls
+                    )
+
+                    if stream:
+                        return iter([
+                            final_response,
+                            {"success": True, "response": final_response, "sources": []}
+                        ])
+
+                    return {
+                        "success": True,
+                        "response": final_response,
+                        "sources": list(all_citations)
+                    }
+
                 # Get final response from the model
-                second_response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages
-                )
+                if stream:
+                    return self._stream_final_response(messages, list(all_citations))
 
-                final_response = second_response.choices[0].message.content
+                final_response = self._chat_completion(messages).content
 
             else:
                 # No function calls needed
                 final_response = response_message.content
-                all_citations = []
+                all_citations = {}
+
+                if stream:
+                    return iter([
+                        final_response,
+                        {"success": True, "response": final_response, "sources": []}
+                    ])
 
             return {
                 "success": True,
                 "response": final_response,
-                "sources": list(set(all_citations))  # Deduplicate citations
+                "sources": list(all_citations)
             }
 
         except Exception as e:
@@ -225,7 +803,49 @@ class RAGAgent:
                 "sources": []
             }
 
-    def _query_ollama(self, user_message: str, conversation_history: List[Dict] = None) -> Dict:
+    def _stream_final_response(self, messages: List, citations: List[str]):
+        """
+        Stream the final chat completion, yielding text chunks as they arrive
+
+        The last item yielded is the standard response dictionary with the
+        accumulated text and deduplicated sources
+
+        Args:
+            messages: Message list for the API
+            citations: Citations collected from tool calls
+        """
+        parts = []
+
+        if self.provider == "openai":
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True
+            )
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    parts.append(delta)
+                    yield delta
+        else:  # ollama
+            response = self.ollama_client.chat(
+                model=self.model,
+                messages=messages,
+                stream=True
+            )
+            for chunk in response:
+                delta = chunk['message']['content']
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        yield {
+            "success": True,
+            "response": "".join(parts),
+            "sources": list(dict.fromkeys(citations))
+        }
+
+    def _query_ollama(self, user_message: str, conversation_history: List[Dict] = None, stream: bool = False) -> Dict:
         """
         Process a user query using Ollama
         Uses a simpler manual retrieval approach since Ollama doesn't have native function calling
@@ -233,13 +853,20 @@ class RAGAgent:
         Args:
             user_message: The user's question
             conversation_history: Optional list of previous messages
+            stream: If True, stream the final completion as an iterator
 
         Returns:
-            Dictionary containing response, sources, and success status
+            Dictionary containing response, sources, and success status,
+            or an iterator of text chunks when stream=True
         """
         try:
-            # Step 1: Retrieve relevant documents
-            retrieval_result = retrieval_tool.retrieve(query=user_message, n_results=5)
+            # Step 1: Retrieve relevant documents, reusing the cache-probe
+            # embedding so the message is only embedded once per turn
+            retrieval_result = retrieval_tool.retrieve(
+                query=user_message,
+                n_results=5,
+                query_embedding=self._pending_query_embedding
+            )
 
             if not retrieval_result.get("success"):
                 return {
@@ -284,18 +911,31 @@ Remember to:
                 "content": user_prompt
             })
 
-            # Step 4: Get response from Ollama
-            response = self.ollama_client.chat(
-                model=self.model,
-                messages=messages
-            )
+            if stream:
+                return self._stream_final_response(messages, citations)
+
+            # Step 4: Get response from Ollama (with exact-prompt
+            # caching; temperature pinned to 0 so the cache only ever
+            # replays deterministic output)
+            key = LLMCache.make_key(self.model, messages)
+            cached = self.llm_cache.get(key)
+
+            if cached is not None:
+                final_response = cached["content"]
+            else:
+                response = self.ollama_client.chat(
+                    model=self.model,
+                    messages=messages,
+                    options={"temperature": 0}
+                )
 
-            final_response = response['message']['content']
+                final_response = response['message']['content']
+                self.llm_cache.set(key, {"content": final_response})
 
             return {
                 "success": True,
                 "response": final_response,
-                "sources": list(set(citations))  # Deduplicate citations
+                "sources": list(dict.fromkeys(citations))
             }
 
         except Exception as e:
@@ -3,7 +3,9 @@ Configuration Management for LLM and Embedding Providers
 Supports both OpenAI and Ollama providers
 """
 
+import functools
 import os
+import types
 from typing import Literal
 from dotenv import load_dotenv
 
@@ -25,9 +27,34 @@ class Config:
     OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3")
     OLLAMA_EMBEDDING_MODEL: str = os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
+    OLLAMA_EMBED_BATCH_SIZE: int = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", "64"))
+    OLLAMA_EMBED_MAX_WORKERS: int = int(os.getenv("OLLAMA_EMBED_MAX_WORKERS", "4"))
+
+    # Agent Behavior
+    # When True, pure metadata queries (list/describe documents) return the
+    # raw tool output directly instead of a second LLM round-trip
+    RAW_TOOL_RESPONSE_SHORTCUT: bool = os.getenv("RAW_TOOL_RESPONSE_SHORTCUT", "true").lower() == "true"
+
+    # Ingestion Configuration
+    # Parsed-document cache keyed by file content hash; set
+    # INGEST_PARSE_CACHE=false to force a fresh parse on every ingest
+    PARSE_CACHE_ENABLED: bool = os.getenv("INGEST_PARSE_CACHE", "true").lower() == "true"
+    PARSE_CACHE_PATH: str = os.getenv("PARSE_CACHE_PATH", "./data/parse_cache")
 
     # Database Configuration
     CHROMA_PATH: str = os.getenv("CHROMA_PATH", "./data/chroma")
+
+    # HNSW index tuning, applied when a collection is first created
+    # (Chroma ignores these for collections that already exist).
+    # With unit-normalized embeddings (OpenAI's are, and ingestion
+    # re-normalizes defensively) "ip" ranks identically to cosine while
+    # skipping a normalization per comparison during ANN traversal; the
+    # default stays "cosine" because Ollama embedding models make no
+    # unit-norm guarantee
+    CHROMA_HNSW_SPACE: str = os.getenv("CHROMA_HNSW_SPACE", "cosine")
+    CHROMA_HNSW_M: int = int(os.getenv("CHROMA_HNSW_M", "24"))
+    CHROMA_HNSW_CONSTRUCTION_EF: int = int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "128"))
+    CHROMA_HNSW_SEARCH_EF: int = int(os.getenv("CHROMA_HNSW_SEARCH_EF", "100"))
     UPLOAD_PATH: str = os.getenv("UPLOAD_PATH", "./data/raw_uploads")
 
     @classmethod
@@ -52,35 +79,55 @@ class Config:
 
     @classmethod
     def get_embedding_config(cls) -> dict:
-        """Get embedding configuration based on provider"""
-        if cls.LLM_PROVIDER == "openai":
-            return {
-                "provider": "openai",
-                "api_key": cls.OPENAI_API_KEY,
-                "model": cls.OPENAI_EMBEDDING_MODEL
-            }
-        else:  # ollama
-            return {
-                "provider": "ollama",
-                "base_url": cls.OLLAMA_BASE_URL,
-                "model": cls.OLLAMA_EMBEDDING_MODEL
-            }
+        """Get embedding configuration based on provider (cached)"""
+        return _embedding_config()
 
     @classmethod
     def get_llm_config(cls) -> dict:
-        """Get LLM configuration based on provider"""
-        if cls.LLM_PROVIDER == "openai":
-            return {
-                "provider": "openai",
-                "api_key": cls.OPENAI_API_KEY,
-                "model": cls.OPENAI_MODEL
-            }
-        else:  # ollama
-            return {
-                "provider": "ollama",
-                "base_url": cls.OLLAMA_BASE_URL,
-                "model": cls.OLLAMA_MODEL
-            }
+        """Get LLM configuration based on provider (cached)"""
+        return _llm_config()
+
+
+@functools.cache
+def _embedding_config() -> types.MappingProxyType:
+    """
+    Build the embedding configuration once and cache it
+
+    Env vars don't change at runtime, so the dict is computed a single
+    time and returned as a read-only mapping so callers can't mutate
+    the cached value
+    """
+    if Config.LLM_PROVIDER == "openai":
+        return types.MappingProxyType({
+            "provider": "openai",
+            "api_key": Config.OPENAI_API_KEY,
+            "model": Config.OPENAI_EMBEDDING_MODEL
+        })
+    else:  # ollama
+        return types.MappingProxyType({
+            "provider": "ollama",
+            "base_url": Config.OLLAMA_BASE_URL,
+            "model": Config.OLLAMA_EMBEDDING_MODEL,
+            "batch_size": Config.OLLAMA_EMBED_BATCH_SIZE,
+            "max_workers": Config.OLLAMA_EMBED_MAX_WORKERS
+        })
+
+
+@functools.cache
+def _llm_config() -> types.MappingProxyType:
+    """Build the LLM configuration once and cache it (read-only mapping)"""
+    if Config.LLM_PROVIDER == "openai":
+        return types.MappingProxyType({
+            "provider": "openai",
+            "api_key": Config.OPENAI_API_KEY,
+            "model": Config.OPENAI_MODEL
+        })
+    else:  # ollama
+        return types.MappingProxyType({
+            "provider": "ollama",
+            "base_url": Config.OLLAMA_BASE_URL,
+            "model": Config.OLLAMA_MODEL
+        })
 
 
 # Global config instance
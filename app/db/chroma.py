@@ -3,10 +3,17 @@ ChromaDB Vector Database Interface
 Handles initialization, persistence, and operations for the local vector store
 """
 
+import asyncio
+import hashlib
 import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import chromadb
+import numpy as np
 from chromadb.utils import embedding_functions
 from dotenv import load_dotenv
 import ollama
@@ -16,21 +23,132 @@ from app.config import config
 load_dotenv()
 
 
+class EmbeddingCache:
+    """
+    Disk-backed cache for chunk embeddings, keyed by (model, text hash)
+    Re-ingesting a document whose chunks were embedded in an earlier
+    session costs zero embedding calls
+    """
+
+    def __init__(self, cache_dir: str = "./data/embedding_cache"):
+        """
+        Initialize the embedding cache
+
+        Args:
+            cache_dir: Directory for the sqlite cache database
+        """
+        cache_path = Path(cache_dir)
+        cache_path.mkdir(parents=True, exist_ok=True)
+        self._db_path = cache_path / "embedding_cache.db"
+        self._init_db()
+
+    def _init_db(self):
+        """Create the cache table if it doesn't exist"""
+        with sqlite3.connect(self._db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache "
+                "(model TEXT, hash TEXT, embedding BLOB, created_at REAL, "
+                "PRIMARY KEY (model, hash))"
+            )
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings for a list of text hashes
+
+        Args:
+            model: Embedding model name
+            hashes: Hex digests of the chunk texts
+
+        Returns:
+            Mapping of hash -> embedding vector for the hashes found
+        """
+        found = {}
+        with sqlite3.connect(self._db_path) as conn:
+            # sqlite caps the number of bound parameters per statement,
+            # so very large lookups are split into slices
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT hash, embedding FROM embedding_cache "
+                    f"WHERE model = ? AND hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def set_many(self, model: str, items: Dict[str, np.ndarray]):
+        """
+        Store embeddings for later sessions
+
+        Args:
+            model: Embedding model name
+            items: Mapping of text hash -> embedding vector
+        """
+        now = time.time()
+        with sqlite3.connect(self._db_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?, ?)",
+                [
+                    (model, text_hash,
+                     np.asarray(embedding, dtype=np.float32).tobytes(), now)
+                    for text_hash, embedding in items.items()
+                ]
+            )
+
+
 class ChromaDBClient:
     """Singleton client for ChromaDB operations"""
 
     _instance = None
     _client = None
-    _collection = None
+    _collections: Dict = {}
+    _default_collection = None
+    _embedding_function = None
+    _embedding_config_key = None
+    _embedding_cache = None
+    _listeners = []
+    _lock = threading.Lock()
+
+    # Rows per collection.add() call; very large single payloads hit
+    # Chroma's slow paths (and its hard cap of ~5.4k records per add),
+    # so ingests are sharded into fixed-size batches
+    ADD_BATCH_SIZE = 512
 
     def __new__(cls):
+        # Double-checked locking: fast path without the lock, re-check
+        # under it so concurrent first calls create exactly one instance
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
 
     def __init__(self):
+        # Python re-runs __init__ on every ChromaDBClient() call even
+        # though __new__ returns the singleton; bail out after first init
+        if getattr(self, "_initialized", False):
+            return
+
+        with self._lock:
+            self._initialized = True
+
+    def _get_client(self):
+        """
+        The underlying PersistentClient, opened on first use
+
+        Construction is deferred past import so processes that never
+        touch the vector store - notably the parse-only ingestion
+        worker processes, which import this module transitively - don't
+        each open Chroma's SQLite files alongside the parent's live
+        client
+        """
         if self._client is None:
-            self._initialize_client()
+            with self._lock:
+                if self._client is None:
+                    self._initialize_client()
+        return self._client
 
     def _initialize_client(self):
         """Initialize ChromaDB client with persistent storage"""
@@ -53,6 +171,20 @@ class ChromaDBClient:
         """
         embedding_config = config.get_embedding_config()
 
+        # The built function owns an HTTP client/session, so reuse it
+        # across collections; rebuild only if the config itself changes
+        config_key = tuple(sorted(embedding_config.items()))
+        if self._embedding_function is not None and self._embedding_config_key == config_key:
+            return self._embedding_function
+
+        embedding_function = self._build_embedding_function(embedding_config)
+        type(self)._embedding_function = embedding_function
+        type(self)._embedding_config_key = config_key
+
+        return embedding_function
+
+    def _build_embedding_function(self, embedding_config: Dict):
+        """Construct the provider-specific embedding function"""
         if embedding_config["provider"] == "openai":
             return embedding_functions.OpenAIEmbeddingFunction(
                 api_key=embedding_config["api_key"],
@@ -61,53 +193,125 @@ class ChromaDBClient:
         else:  # ollama
             # Create custom Ollama embedding function
             class OllamaEmbeddingFunction:
-                def __init__(self, model_name: str, base_url: str):
+                def __init__(
+                    self,
+                    model_name: str,
+                    base_url: str,
+                    batch_size: int = 64,
+                    max_workers: int = 4
+                ):
                     self.model_name = model_name
                     self.base_url = base_url
-                    # Initialize ollama client
+                    self.batch_size = batch_size
+                    self.max_workers = max_workers
+                    # Initialize ollama client (shared httpx session with
+                    # keep-alive, safe to use across worker threads)
                     self.client = ollama.Client(host=base_url)
 
-                def __call__(self, input: List[str]) -> List[List[float]]:
-                    """Generate embeddings for a list of texts"""
-                    embeddings = []
-                    for text in input:
-                        response = self.client.embeddings(
+                def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+                    """Embed one batch of texts in a single round-trip"""
+                    # Batch endpoint: one HTTP round-trip for all texts
+                    # instead of one per chunk
+                    try:
+                        response = self.client.embed(
                             model=self.model_name,
-                            prompt=text
+                            input=texts
                         )
-                        embeddings.append(response['embedding'])
-                    return embeddings
+                        return response['embeddings']
+                    except Exception:
+                        # Older Ollama servers don't expose /api/embed;
+                        # fall back to sequential per-text embedding
+                        embeddings = []
+                        for text in texts:
+                            response = self.client.embeddings(
+                                model=self.model_name,
+                                prompt=text
+                            )
+                            embeddings.append(response['embedding'])
+                        return embeddings
+
+                def __call__(self, input: List[str]) -> np.ndarray:
+                    """Generate embeddings for a list of texts"""
+                    # A contiguous float32 matrix halves memory versus
+                    # boxed Python floats and skips a conversion pass
+                    # inside Chroma
+                    if len(input) <= self.batch_size:
+                        return np.asarray(self._embed_batch(input), dtype=np.float32)
+
+                    # Large ingests: split into sub-batches and embed them
+                    # concurrently; executor.map preserves input order
+                    batches = [
+                        input[i:i + self.batch_size]
+                        for i in range(0, len(input), self.batch_size)
+                    ]
+                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                        results = list(executor.map(self._embed_batch, batches))
+
+                    return np.asarray(
+                        [embedding for batch in results for embedding in batch],
+                        dtype=np.float32
+                    )
 
             return OllamaEmbeddingFunction(
                 model_name=embedding_config["model"],
-                base_url=embedding_config["base_url"]
+                base_url=embedding_config["base_url"],
+                batch_size=embedding_config.get("batch_size", 64),
+                max_workers=embedding_config.get("max_workers", 4)
             )
 
     def get_or_create_collection(self, collection_name: str = "rag_documents"):
         """
         Get or create a ChromaDB collection for documents
 
+        Collections are cached by name, so repeat calls are a single
+        dict lookup instead of a round-trip into Chroma
+
         Args:
             collection_name: Name of the collection
 
         Returns:
             ChromaDB collection object
         """
-        if self._collection is None or self._collection.name != collection_name:
-            embedding_function = self._get_embedding_function()
-            self._collection = self._client.get_or_create_collection(
-                name=collection_name,
-                embedding_function=embedding_function,
-                metadata={"description": "RAG system documents and chunks"}
-            )
-        return self._collection
+        collection = self._collections.get(collection_name)
+
+        if collection is None:
+            # Resolve the client before taking the lock (both use it)
+            client = self._get_client()
+
+            # Double-checked locking so parallel tool calls don't race
+            # into Chroma's get_or_create_collection
+            with self._lock:
+                collection = self._collections.get(collection_name)
+                if collection is None:
+                    embedding_function = self._get_embedding_function()
+                    collection = client.get_or_create_collection(
+                        name=collection_name,
+                        embedding_function=embedding_function,
+                        metadata={
+                            "description": "RAG system documents and chunks",
+                            # Explicit HNSW parameters instead of Chroma's
+                            # conservative defaults (M=16, ef=100/10)
+                            "hnsw:space": config.CHROMA_HNSW_SPACE,
+                            "hnsw:M": config.CHROMA_HNSW_M,
+                            "hnsw:construction_ef": config.CHROMA_HNSW_CONSTRUCTION_EF,
+                            "hnsw:search_ef": config.CHROMA_HNSW_SEARCH_EF,
+                            "hnsw:num_threads": os.cpu_count()
+                        }
+                    )
+                    self._collections[collection_name] = collection
+
+                    # Keep a direct reference for the default-collection fast path
+                    if collection_name == "rag_documents":
+                        type(self)._default_collection = collection
+
+        return collection
 
     def add_chunks(
         self,
         chunks: List[str],
         metadatas: List[Dict],
         ids: List[str],
-        embeddings: Optional[List[List[float]]] = None
+        embeddings: Optional[Union[List[List[float]], np.ndarray]] = None
     ):
         """
         Add document chunks to the collection
@@ -116,25 +320,98 @@ class ChromaDBClient:
             chunks: List of text chunks
             metadatas: List of metadata dictionaries for each chunk
             ids: List of unique IDs for each chunk
-            embeddings: Optional pre-computed embeddings (if None, ChromaDB will compute them)
+            embeddings: Optional pre-computed embeddings as a list of
+                        vectors or a float32 ndarray (if None, ChromaDB
+                        will compute them)
         """
-        collection = self.get_or_create_collection()
+        collection = self._default_collection or self.get_or_create_collection()
+
+        if embeddings is None and chunks:
+            # Embed through the dedup path: duplicate chunk texts
+            # (boilerplate headers/footers) and texts embedded in earlier
+            # sessions are served from cache instead of re-embedded
+            embeddings = self._embed_deduplicated(chunks)
+
+        for start in range(0, len(chunks), self.ADD_BATCH_SIZE):
+            end = start + self.ADD_BATCH_SIZE
 
-        if embeddings:
-            collection.add(
-                documents=chunks,
-                metadatas=metadatas,
-                ids=ids,
-                embeddings=embeddings
-            )
-        else:
-            # Let ChromaDB compute embeddings using its default embedding function
             collection.add(
-                documents=chunks,
-                metadatas=metadatas,
-                ids=ids
+                documents=chunks[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end],
+                embeddings=embeddings[start:end]
             )
 
+        self._notify_listeners("add", metadatas)
+
+    def register_listener(self, callback):
+        """
+        Register a callback invoked after collection mutations
+
+        Callbacks receive (event, metadatas): event is "add" with the
+        added chunk metadatas, or "reset" with None when the collection
+        is deleted or reset. Lets read-side caches stay incremental
+        instead of re-scanning the collection
+
+        Args:
+            callback: Callable taking (event, metadatas)
+        """
+        self._listeners.append(callback)
+
+    def _notify_listeners(self, event: str, metadatas: Optional[List[Dict]] = None):
+        """Fan a mutation event out to registered listeners"""
+        for callback in self._listeners:
+            try:
+                callback(event, metadatas)
+            except Exception as e:
+                # A broken listener must not fail the write path
+                print(f"Error in collection listener: {e}")
+
+    def _embed_deduplicated(self, chunks: List[str]) -> np.ndarray:
+        """
+        Embed chunk texts, computing each distinct text at most once
+
+        Byte-identical chunks are hashed and collapsed before the
+        embedding call, and results are checked against the on-disk
+        EmbeddingCache first, so only texts never seen before reach the
+        embedding provider
+
+        Args:
+            chunks: Chunk texts in ingestion order
+
+        Returns:
+            Float32 embedding matrix aligned with the input order
+        """
+        if type(self)._embedding_cache is None:
+            type(self)._embedding_cache = EmbeddingCache()
+
+        model = config.get_embedding_config()["model"]
+        hashes = [
+            hashlib.blake2b(chunk.encode(), digest_size=16).hexdigest()
+            for chunk in chunks
+        ]
+
+        # Collapse duplicates, keeping the first text for each hash
+        unique_texts: Dict[str, str] = {}
+        for text_hash, chunk in zip(hashes, chunks):
+            if text_hash not in unique_texts:
+                unique_texts[text_hash] = chunk
+
+        by_hash = self._embedding_cache.get_many(model, list(unique_texts))
+
+        missing = [h for h in unique_texts if h not in by_hash]
+        if missing:
+            embedding_function = self._get_embedding_function()
+            new_embeddings = embedding_function([unique_texts[h] for h in missing])
+            new_items = {
+                text_hash: np.asarray(embedding, dtype=np.float32)
+                for text_hash, embedding in zip(missing, new_embeddings)
+            }
+            by_hash.update(new_items)
+            self._embedding_cache.set_many(model, new_items)
+
+        return np.asarray([by_hash[h] for h in hashes], dtype=np.float32)
+
     def query(
         self,
         query_text: str,
@@ -152,7 +429,7 @@ class ChromaDBClient:
         Returns:
             Dictionary with query results including documents, metadatas, and distances
         """
-        collection = self.get_or_create_collection()
+        collection = self._default_collection or self.get_or_create_collection()
 
         results = collection.query(
             query_texts=[query_text],
@@ -162,11 +439,42 @@ class ChromaDBClient:
 
         return results
 
+    def query_batch(
+        self,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Query the collection with several query texts in a single call
+
+        Batching amortizes the per-query search setup, so N queries cost
+        close to one round-trip instead of N
+
+        Args:
+            query_texts: List of query strings
+            n_results: Number of results to return per query
+            where: Optional metadata filter
+
+        Returns:
+            Dictionary with per-query result lists
+        """
+        collection = self._default_collection or self.get_or_create_collection()
+
+        results = collection.query(
+            query_texts=query_texts,
+            n_results=n_results,
+            where=where
+        )
+
+        return results
+
     def query_with_embeddings(
         self,
         query_embeddings: List[List[float]],
         n_results: int = 5,
-        where: Optional[Dict] = None
+        where: Optional[Dict] = None,
+        include: Optional[List[str]] = None
     ) -> Dict:
         """
         Query the collection using pre-computed embeddings
@@ -175,37 +483,180 @@ class ChromaDBClient:
             query_embeddings: Pre-computed query embeddings
             n_results: Number of results to return
             where: Optional metadata filter
+            include: Optional list of result fields to return; trimming
+                     it spares serializing documents/embeddings the
+                     caller won't use
 
         Returns:
             Dictionary with query results
         """
-        collection = self.get_or_create_collection()
+        collection = self._default_collection or self.get_or_create_collection()
+
+        if include is not None:
+            return collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where,
+                include=include
+            )
 
-        results = collection.query(
+        return collection.query(
             query_embeddings=query_embeddings,
             n_results=n_results,
             where=where
         )
 
-        return results
+    def get_by_metadata(
+        self,
+        where: Dict,
+        limit: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Fetch records by metadata filter without a vector search
+
+        A plain collection.get: no query embedding and no ANN traversal,
+        just an indexed metadata lookup
+
+        Args:
+            where: Metadata filter (e.g., {"filename": "report.pdf"})
+            limit: Optional maximum number of records
+            include: Result fields to return (documents and metadatas
+                     by default)
+
+        Returns:
+            Dictionary with flat result lists
+        """
+        collection = self._default_collection or self.get_or_create_collection()
+
+        return collection.get(
+            where=where,
+            limit=limit,
+            include=include or ["documents", "metadatas"]
+        )
+
+    def get_metadata_aggregates(self) -> Optional[List[Dict]]:
+        """
+        Per-file chunk aggregates straight from Chroma's SQLite store
+
+        Chroma keeps chunk metadata in an entity-attribute-value table
+        (embedding_metadata) inside chroma.sqlite3; a single read-only
+        GROUP BY over it computes every file's type, timestamp and chunk
+        count in native C, instead of paging the whole collection's
+        metadata through Python dict updates
+
+        Returns:
+            List of {filename, file_type, upload_timestamp, chunk_count}
+            dictionaries, or None when the store can't be read (missing
+            file, schema drift across Chroma versions) - callers fall
+            back to the paged Python scan
+        """
+        db_path = Path(config.CHROMA_PATH) / "chroma.sqlite3"
+        if not db_path.exists():
+            return None
+
+        try:
+            connection = sqlite3.connect(
+                f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+            try:
+                rows = connection.execute(
+                    """
+                    SELECT fn.string_value,
+                           MAX(ft.string_value),
+                           MAX(ts.string_value),
+                           COUNT(*)
+                    FROM embedding_metadata AS fn
+                    LEFT JOIN embedding_metadata AS ft
+                           ON ft.id = fn.id AND ft.key = 'file_type'
+                    LEFT JOIN embedding_metadata AS ts
+                           ON ts.id = fn.id AND ts.key = 'upload_timestamp'
+                    WHERE fn.key = 'filename'
+                    GROUP BY fn.string_value
+                    """
+                ).fetchall()
+            finally:
+                connection.close()
+
+            return [
+                {
+                    "filename": filename,
+                    "file_type": file_type or "unknown",
+                    "upload_timestamp": upload_timestamp or "unknown",
+                    "chunk_count": chunk_count
+                }
+                for filename, file_type, upload_timestamp, chunk_count in rows
+            ]
+
+        except sqlite3.Error:
+            return None
+
+    async def aquery(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Async variant of query()
+
+        Chroma's local PersistentClient has no native async API, so the
+        blocking search runs in a worker thread; this lets an event loop
+        interleave multiple retrievals with other I/O
+
+        Args:
+            query_text: The query string
+            n_results: Number of results to return
+            where: Optional metadata filter
+
+        Returns:
+            Dictionary with query results
+        """
+        return await asyncio.to_thread(self.query, query_text, n_results, where)
+
+    async def aquery_with_embeddings(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Async variant of query_with_embeddings(), run in a worker thread
+
+        Args:
+            query_embeddings: Pre-computed query embeddings
+            n_results: Number of results to return
+            where: Optional metadata filter
+
+        Returns:
+            Dictionary with query results
+        """
+        return await asyncio.to_thread(
+            self.query_with_embeddings, query_embeddings, n_results, where
+        )
 
     def get_collection_count(self) -> int:
         """Get the number of documents in the collection"""
-        collection = self.get_or_create_collection()
+        collection = self._default_collection or self.get_or_create_collection()
         return collection.count()
 
     def delete_collection(self, collection_name: str = "rag_documents"):
         """Delete a collection"""
         try:
-            self._client.delete_collection(name=collection_name)
-            self._collection = None
+            self._get_client().delete_collection(name=collection_name)
+            self._collections.pop(collection_name, None)
+            if collection_name == "rag_documents":
+                type(self)._default_collection = None
+            self._notify_listeners("reset")
         except Exception as e:
             print(f"Error deleting collection: {e}")
 
     def reset(self):
         """Reset the ChromaDB client and delete all collections"""
-        self._client.reset()
-        self._collection = None
+        self._get_client().reset()
+        self._collections.clear()
+        type(self)._default_collection = None
+        self._notify_listeners("reset")
 
 
 # Global instance
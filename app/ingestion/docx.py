@@ -37,8 +37,10 @@ class WordParser:
             if not text:
                 continue
 
-            # Check if this is a heading
-            is_heading = paragraph.style.name.startswith('Heading')
+            # paragraph.style.name walks the styles XML tree; resolve it
+            # once per paragraph and reuse it below
+            style_name = paragraph.style.name
+            is_heading = style_name.startswith('Heading')
 
             if is_heading:
                 # Update current section to this heading
@@ -51,7 +53,7 @@ class WordParser:
                     "metadata": {
                         "filename": filename,
                         "paragraph_number": para_num,
-                        "style": paragraph.style.name,
+                        "style": style_name,
                         "content_type": "heading",
                         "section_number": section_counter
                     }
@@ -64,7 +66,7 @@ class WordParser:
                     "metadata": {
                         "filename": filename,
                         "paragraph_number": para_num,
-                        "style": paragraph.style.name,
+                        "style": style_name,
                         "content_type": "paragraph",
                         "parent_section": current_section
                     }
@@ -72,9 +74,12 @@ class WordParser:
 
         # Extract tables
         for table_num, table in enumerate(doc.tables, start=1):
+            # table.rows and row.cells rebuild proxy objects over the XML
+            # tree on every access; materialize each exactly once
+            rows = table.rows
             table_text_parts = []
 
-            for row in table.rows:
+            for row in rows:
                 row_text = " | ".join(cell.text.strip() for cell in row.cells)
                 if row_text.strip():
                     table_text_parts.append(row_text)
@@ -88,7 +93,7 @@ class WordParser:
                         "filename": filename,
                         "content_type": "table",
                         "table_number": table_num,
-                        "rows": len(table.rows),
+                        "rows": len(rows),
                         "columns": len(table.columns)
                     }
                 })
@@ -108,14 +113,18 @@ class WordParser:
         doc = Document(file_path)
         path = Path(file_path)
 
-        # Count headings
-        headings = [p for p in doc.paragraphs if p.style.name.startswith('Heading')]
+        # Single sweep: count paragraphs and headings together, resolving
+        # each paragraph's style name only once
+        paragraphs = doc.paragraphs
+        total_headings = sum(
+            1 for p in paragraphs if p.style.name.startswith('Heading')
+        )
 
         return {
             "filename": path.name,
             "file_type": "docx",
-            "total_paragraphs": len(doc.paragraphs),
+            "total_paragraphs": len(paragraphs),
             "total_tables": len(doc.tables),
-            "total_headings": len(headings),
+            "total_headings": total_headings,
             "file_size_bytes": path.stat().st_size
         }
@@ -29,17 +29,19 @@ class PowerPointParser:
         filename = Path(file_path).name
 
         for slide_num, slide in enumerate(prs.slides, start=1):
-            # Extract slide title
-            title_text = ""
-            if slide.shapes.title:
-                title_text = slide.shapes.title.text
+            # Resolve the title placeholder once (it walks the slide's
+            # placeholders) instead of probing it again per shape
+            title_shape = slide.shapes.title
+            title_text = title_shape.text if title_shape is not None else ""
 
-            # Extract text from all shapes
+            # Extract text from all shapes in a single pass; getattr with
+            # a default is cheaper than hasattr + a second attribute read
             slide_text_parts = []
 
             for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text:
-                    slide_text_parts.append(shape.text)
+                shape_text = getattr(shape, "text", None)
+                if shape_text:
+                    slide_text_parts.append(shape_text)
 
             # Combine all text from the slide
             slide_text = "\n".join(slide_text_parts)
@@ -3,15 +3,36 @@ Excel (XLSX) Document Parser
 Extracts data from sheets, tables, and headers
 """
 
+import functools
+import gc
 from pathlib import Path
-from typing import List, Dict
-import pandas as pd
+from typing import List, Dict, Tuple
 from openpyxl import load_workbook
 
 
 class ExcelParser:
     """Parser for Excel (.xlsx) files"""
 
+    # Embedding models cap input around 8k tokens; chunks are sized so
+    # they don't get silently truncated downstream
+    EMBED_TOKEN_BUDGET = 8000
+
+    # Rough chars-per-token ratio used to turn the budget into rows
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, max_rows: int = 100, max_cell_chars: int = 256):
+        """
+        Initialize the parser
+
+        Args:
+            max_rows: Maximum rows per chunk (shrunk further when wide
+                      rows would blow the embedding token budget)
+            max_cell_chars: Maximum characters kept per cell, so one
+                            pathological long cell can't dominate a chunk
+        """
+        self.max_rows = max_rows
+        self.max_cell_chars = max_cell_chars
+
     def parse(self, file_path: str) -> List[Dict]:
         """
         Parse an Excel file and extract structured content
@@ -28,90 +49,151 @@ class ExcelParser:
         chunks = []
         filename = Path(file_path).name
 
-        # Load workbook to get sheet names
-        wb = load_workbook(file_path, read_only=True, data_only=True)
+        # Stream rows straight out of openpyxl's read-only mode: peak
+        # memory stays at one chunk's worth of rows per sheet instead of
+        # the whole sheet materialized as a DataFrame before chunking
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet_name in workbook.sheetnames:
+                try:
+                    self._parse_sheet(
+                        workbook[sheet_name], sheet_name, filename, chunks
+                    )
+                except Exception as e:
+                    # If sheet cannot be read, create an error chunk
+                    chunks.append({
+                        "text": f"Error reading sheet: {str(e)}",
+                        "section": f"Sheet: {sheet_name} (Error)",
+                        "metadata": {
+                            "filename": filename,
+                            "sheet_name": sheet_name,
+                            "error": str(e),
+                            "content_type": "error"
+                        }
+                    })
+
+                # Big sheets shed a lot of short-lived objects; collect
+                # between sheets to curb fragmentation on large workbooks
+                gc.collect()
+        finally:
+            workbook.close()
+
+        return chunks
 
-        for sheet_name in wb.sheetnames:
-            # Read sheet with pandas for easier data handling
-            try:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+    def _parse_sheet(
+        self,
+        worksheet,
+        sheet_name: str,
+        filename: str,
+        chunks: List[Dict]
+    ):
+        """
+        Stream one worksheet into table chunks
 
-                # Skip empty sheets
-                if df.empty:
-                    continue
+        Rows are formatted as they come off openpyxl's read-only
+        iterator and flushed every max_rows, so only one chunk of rows
+        is resident at a time
 
-                # Convert dataframe to text representation
-                # Include column headers and data
-                text_parts = []
+        Args:
+            worksheet: Read-only openpyxl worksheet
+            sheet_name: Name of the sheet being parsed
+            filename: Name of the source file
+            chunks: Output list the sheet's chunks are appended to
+        """
+        max_rows = self.max_rows  # Rows per chunk; also bounds memory
 
-                # Add headers
-                headers = " | ".join(str(col) for col in df.columns)
-                text_parts.append(f"Headers: {headers}")
+        rows_iter = worksheet.iter_rows(values_only=True)
+        header = next(rows_iter, None)
+        if header is None:
+            # Skip empty sheets
+            return
 
-                # Add rows (limit to prevent huge chunks)
-                max_rows = 100  # Configurable limit
-                for idx, row in df.head(max_rows).iterrows():
-                    row_text = " | ".join(str(val) for val in row.values)
-                    text_parts.append(row_text)
+        # Column invariants hoisted once per sheet; every chunk's
+        # metadata reuses them instead of recomputing per flush
+        column_names = ["" if value is None else str(value) for value in header]
+        num_columns = len(column_names)
+        headers = " | ".join(column_names)
+        # Built once per sheet and shared by every flush, instead of
+        # re-concatenating the prefix for each overflow chunk
+        header_line = f"Headers: {headers}\n"
 
-                sheet_text = "\n".join(text_parts)
+        first_chunk_index = None
+        buffer = []
+        chunk_start = 0
+        total_rows = 0
 
-                # Create chunk for this sheet
+        def flush():
+            nonlocal first_chunk_index
+            # One join over the row buffer plus one concat: no unpacking
+            # of the buffer into a fresh list per chunk
+            text = header_line + "\n".join(buffer)
+            if chunk_start == 0:
+                first_chunk_index = len(chunks)
                 chunks.append({
-                    "text": sheet_text,
+                    "text": text,
                     "section": f"Sheet: {sheet_name}",
                     "metadata": {
                         "filename": filename,
                         "sheet_name": sheet_name,
-                        "rows": len(df),
-                        "columns": len(df.columns),
-                        "column_names": df.columns.tolist(),
+                        # Patched to the real count once the sheet is
+                        # exhausted; streaming doesn't know it up front
+                        "rows": 0,
+                        "columns": num_columns,
+                        "column_names": column_names,
                         "content_type": "table"
                     }
                 })
-
-                # If sheet is too large, create additional chunks for remaining rows
-                if len(df) > max_rows:
-                    remaining_rows = len(df) - max_rows
-                    for chunk_start in range(max_rows, len(df), max_rows):
-                        chunk_df = df.iloc[chunk_start:chunk_start + max_rows]
-                        chunk_text_parts = [f"Headers: {headers}"]
-
-                        for idx, row in chunk_df.iterrows():
-                            row_text = " | ".join(str(val) for val in row.values)
-                            chunk_text_parts.append(row_text)
-
-                        chunk_text = "\n".join(chunk_text_parts)
-
-                        chunks.append({
-                            "text": chunk_text,
-                            "section": f"Sheet: {sheet_name} (rows {chunk_start + 1}-{min(chunk_start + max_rows, len(df))})",
-                            "metadata": {
-                                "filename": filename,
-                                "sheet_name": sheet_name,
-                                "row_start": chunk_start + 1,
-                                "row_end": min(chunk_start + max_rows, len(df)),
-                                "columns": len(df.columns),
-                                "column_names": df.columns.tolist(),
-                                "content_type": "table"
-                            }
-                        })
-
-            except Exception as e:
-                # If sheet cannot be read, create an error chunk
+            else:
                 chunks.append({
-                    "text": f"Error reading sheet: {str(e)}",
-                    "section": f"Sheet: {sheet_name} (Error)",
+                    "text": text,
+                    "section": f"Sheet: {sheet_name} (rows {chunk_start + 1}-{chunk_start + len(buffer)})",
                     "metadata": {
                         "filename": filename,
                         "sheet_name": sheet_name,
-                        "error": str(e),
-                        "content_type": "error"
+                        "row_start": chunk_start + 1,
+                        "row_end": chunk_start + len(buffer),
+                        "columns": num_columns,
+                        "column_names": column_names,
+                        "content_type": "table"
                     }
                 })
 
-        wb.close()
-        return chunks
+        for row in rows_iter:
+            row_text = self._format_row(row)
+
+            # Size chunks off the first data row so rows aren't fully
+            # formatted into a chunk the embedding model would truncate:
+            # for wide sheets this lowers max_rows before any work is
+            # wasted on rows past the budget
+            if total_rows == 0:
+                budget_chars = (
+                    self.EMBED_TOKEN_BUDGET * self.CHARS_PER_TOKEN
+                    - len(header_line)
+                )
+                per_row_chars = len(row_text) + 1
+                max_rows = max(1, min(max_rows, budget_chars // per_row_chars))
+
+            buffer.append(row_text)
+            total_rows += 1
+            if len(buffer) == max_rows:
+                flush()
+                chunk_start = total_rows
+                buffer = []
+
+        if buffer:
+            flush()
+
+        if first_chunk_index is not None:
+            chunks[first_chunk_index]["metadata"]["rows"] = total_rows
+
+    def _format_row(self, row) -> str:
+        """Render one row tuple, capping each cell's length"""
+        # List comprehension rather than a generator: join can size its
+        # result in one pass instead of growing it item by item
+        max_chars = self.max_cell_chars
+        return " | ".join(
+            ["" if value is None else str(value)[:max_chars] for value in row]
+        )
 
     def get_metadata(self, file_path: str) -> Dict:
         """
@@ -123,31 +205,62 @@ class ExcelParser:
         Returns:
             Dictionary containing file metadata
         """
-        wb = load_workbook(file_path, read_only=True, data_only=True)
         path = Path(file_path)
+        stat = path.stat()
 
-        sheet_info = []
-        for sheet_name in wb.sheetnames:
-            try:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
-                sheet_info.append({
-                    "name": sheet_name,
-                    "rows": len(df),
-                    "columns": len(df.columns)
-                })
-            except:
-                sheet_info.append({
-                    "name": sheet_name,
-                    "error": "Unable to read sheet"
-                })
-
-        wb.close()
+        # Repeat metadata requests for an unchanged file (same mtime)
+        # come out of the summary cache instead of re-parsing the archive
+        sheet_names, sheet_info = self._sheet_summaries(
+            str(path), stat.st_mtime
+        )
 
         return {
             "filename": path.name,
             "file_type": "xlsx",
-            "total_sheets": len(wb.sheetnames),
-            "sheet_names": wb.sheetnames,
-            "sheet_info": sheet_info,
-            "file_size_bytes": path.stat().st_size
+            "total_sheets": len(sheet_names),
+            "sheet_names": list(sheet_names),
+            "sheet_info": [dict(info) for info in sheet_info],
+            "file_size_bytes": stat.st_size
         }
+
+    @functools.lru_cache(maxsize=8)
+    def _sheet_summaries(self, file_path: str, mtime: float) -> Tuple[Tuple, Tuple]:
+        """
+        Read sheet names and per-sheet dimensions in one archive parse
+
+        Cached by (path, mtime) so back-to-back metadata calls for the
+        same unchanged workbook parse it once; results are tuples so the
+        cached value stays immutable
+
+        Args:
+            file_path: Path to the .xlsx file
+            mtime: File modification time (cache invalidation key)
+
+        Returns:
+            Tuple of (sheet names, per-sheet info dictionaries)
+        """
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet_names = tuple(workbook.sheetnames)
+
+            sheet_info = []
+            for sheet_name in sheet_names:
+                try:
+                    worksheet = workbook[sheet_name]
+                    # Dimensions straight from the sheet header - no
+                    # cell scan; max_row includes the header row, which
+                    # the reported data-row count excludes
+                    sheet_info.append({
+                        "name": sheet_name,
+                        "rows": max((worksheet.max_row or 1) - 1, 0),
+                        "columns": worksheet.max_column or 0
+                    })
+                except Exception:
+                    sheet_info.append({
+                        "name": sheet_name,
+                        "error": "Unable to read sheet"
+                    })
+        finally:
+            workbook.close()
+
+        return sheet_names, tuple(sheet_info)
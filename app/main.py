@@ -5,6 +5,7 @@ Local Agentic RAG - Main Streamlit Application
 import streamlit as st
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -26,6 +27,27 @@ if not is_valid:
     st.info("Please check your .env file and ensure it's properly configured.")
     st.stop()
 
+@st.cache_resource
+def _ingest_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for ingestion, created once per process"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+# Every widget interaction reruns this script, so uncached calls here
+# would hit Chroma on each keystroke; the generation argument busts the
+# cache after an ingest, the ttl catches out-of-band changes
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_indexed_files(generation: int) -> dict:
+    """Indexed-file listing, cached per ingest generation"""
+    return metadata_query_tool.list_indexed_files()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_collection_stats(generation: int) -> dict:
+    """Collection statistics, cached per ingest generation"""
+    return metadata_query_tool.get_collection_stats()
+
+
 # Configure page
 st.set_page_config(
     page_title="Local Agentic RAG",
@@ -37,14 +59,22 @@ st.set_page_config(
 # Initialize session state
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "ingest_gen" not in st.session_state:
+    # Bumped after each successful ingest to invalidate cached reads
+    st.session_state.ingest_gen = 0
 if "uploaded_files_list" not in st.session_state:
     st.session_state.uploaded_files_list = []
     # Load previously indexed files from ChromaDB
-    indexed_files_result = metadata_query_tool.list_indexed_files()
+    indexed_files_result = _cached_indexed_files(st.session_state.ingest_gen)
     if indexed_files_result.get("success") and indexed_files_result.get("files"):
         st.session_state.uploaded_files_list = [
             f["filename"] for f in indexed_files_result["files"]
         ]
+    # Set mirror of the list for O(1) membership checks; the list keeps
+    # its role as the ordered display source
+    st.session_state.uploaded_files_set = set(st.session_state.uploaded_files_list)
+if "uploaded_files_set" not in st.session_state:
+    st.session_state.uploaded_files_set = set(st.session_state.uploaded_files_list)
 
 # Main title
 st.title("📚 Local Agentic RAG")
@@ -88,52 +118,96 @@ with st.sidebar:
 
         # Upload button
         if st.button("Process Documents", type="primary"):
-            with st.spinner("Processing documents..."):
-                file_paths = []
-
-                for uploaded_file in uploaded_files:
-                    if uploaded_file.name not in st.session_state.uploaded_files_list:
-                        # Save file to raw_uploads
-                        upload_path = Path(os.getenv("UPLOAD_PATH", "./data/raw_uploads"))
-                        upload_path.mkdir(parents=True, exist_ok=True)
-
-                        file_path = upload_path / uploaded_file.name
-                        with open(file_path, "wb") as f:
-                            f.write(uploaded_file.getbuffer())
-
-                        file_paths.append(str(file_path))
-
-                # Ingest documents
-                if file_paths:
-                    result = ingestion_tool.ingest_multiple_documents(file_paths)
-
-                    if result["successful"] > 0:
-                        st.success(
-                            f"✓ Successfully processed {result['successful']} file(s) "
-                            f"({result['total_chunks']} chunks created)"
-                        )
-
-                        # Update uploaded files list
-                        for file_result in result["results"]:
-                            if file_result.get("success"):
-                                filename = file_result["file"]
-                                if filename not in st.session_state.uploaded_files_list:
-                                    st.session_state.uploaded_files_list.append(filename)
-
-                    if result["failed"] > 0:
-                        st.warning(f"⚠ Failed to process {result['failed']} file(s)")
-                        for file_result in result["results"]:
-                            if not file_result.get("success"):
-                                st.error(f"Error in {file_result['file']}: {file_result.get('error')}")
-                else:
-                    st.info("All selected files have already been processed.")
+            file_paths = []
+
+            for uploaded_file in uploaded_files:
+                if uploaded_file.name not in st.session_state.uploaded_files_set:
+                    # Save file to raw_uploads
+                    upload_path = Path(os.getenv("UPLOAD_PATH", "./data/raw_uploads"))
+                    upload_path.mkdir(parents=True, exist_ok=True)
+
+                    # Stream to disk in 1 MB chunks: getbuffer() would
+                    # materialize the whole upload a second time in RSS,
+                    # which Streamlit already holds for the session
+                    file_path = upload_path / uploaded_file.name
+                    with open(file_path, "wb") as f:
+                        while chunk := uploaded_file.read(1 << 20):
+                            f.write(chunk)
+                    # Rewind so Streamlit can reuse the buffer internally
+                    uploaded_file.seek(0)
+
+                    file_paths.append(str(file_path))
+
+            # Ingest documents on worker threads so the script
+            # thread keeps redrawing; per-file results stream into
+            # the status box as they finish instead of one long
+            # spinner (each file still batches its own embeddings)
+            if file_paths:
+                executor = _ingest_executor()
+
+                with st.status("Processing documents...", expanded=True) as status:
+                    progress_bar = st.progress(0.0)
+                    futures = [
+                        executor.submit(ingestion_tool.ingest_document, p)
+                        for p in file_paths
+                    ]
+
+                    results = []
+                    for done, future in enumerate(as_completed(futures), 1):
+                        file_result = future.result()
+                        results.append(file_result)
+
+                        if file_result.get("success"):
+                            status.write(
+                                f"✓ {file_result['file']} "
+                                f"({file_result['chunks_created']} chunks)"
+                            )
+                        else:
+                            status.write(
+                                f"✗ {file_result['file']}: {file_result.get('error')}"
+                            )
+                        progress_bar.progress(done / len(futures))
+
+                    successful = sum(1 for r in results if r.get("success"))
+                    failed = len(results) - successful
+                    status.update(
+                        label=f"Processed {successful}/{len(results)} file(s)",
+                        state="complete" if failed == 0 else "error",
+                        expanded=failed > 0
+                    )
+
+                if successful > 0:
+                    st.session_state.ingest_gen += 1
+                    total_chunks = sum(
+                        r.get("chunks_created", 0) for r in results if r.get("success")
+                    )
+                    st.success(
+                        f"✓ Successfully processed {successful} file(s) "
+                        f"({total_chunks} chunks created)"
+                    )
+
+                    # Update uploaded files list
+                    for file_result in results:
+                        if file_result.get("success"):
+                            filename = file_result["file"]
+                            if filename not in st.session_state.uploaded_files_set:
+                                st.session_state.uploaded_files_list.append(filename)
+                                st.session_state.uploaded_files_set.add(filename)
+
+                if failed > 0:
+                    st.warning(f"⚠ Failed to process {failed} file(s)")
+                    for file_result in results:
+                        if not file_result.get("success"):
+                            st.error(f"Error in {file_result['file']}: {file_result.get('error')}")
+            else:
+                st.info("All selected files have already been processed.")
 
     # Display database statistics and indexed files
     if st.session_state.uploaded_files_list:
         st.markdown("---")
 
         # Get database stats
-        stats = metadata_query_tool.get_collection_stats()
+        stats = _cached_collection_stats(st.session_state.ingest_gen)
         if stats.get("success"):
             st.subheader("📊 Database Statistics")
             col1, col2 = st.columns(2)
@@ -151,11 +225,15 @@ with st.sidebar:
 
         # Add refresh button to reload file list
         if st.button("🔄 Refresh List", help="Reload indexed documents from database"):
-            indexed_files_result = metadata_query_tool.list_indexed_files()
+            st.session_state.ingest_gen += 1
+            indexed_files_result = _cached_indexed_files(st.session_state.ingest_gen)
             if indexed_files_result.get("success") and indexed_files_result.get("files"):
                 st.session_state.uploaded_files_list = [
                     f["filename"] for f in indexed_files_result["files"]
                 ]
+                st.session_state.uploaded_files_set = set(
+                    st.session_state.uploaded_files_list
+                )
                 st.rerun()
 
 # Main chat interface
@@ -3,52 +3,127 @@ Document Ingestion Tool
 Orchestrates parsing, chunking, embedding, and storage of documents
 """
 
+import base64
+import hashlib
+import importlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
+import numpy as np
 from dotenv import load_dotenv
-from openai import OpenAI
 
-from app.ingestion.pdf import PDFParser
-from app.ingestion.pptx import PowerPointParser
-from app.ingestion.docx import WordParser
-from app.ingestion.xlsx import ExcelParser
 from app.ingestion.chunker import TextChunker
 from app.ingestion.metadata import MetadataExtractor
 from app.db.chroma import chroma_client
+from app.config import config
 
 load_dotenv()
 
+# Batches at or above this size parse in worker processes; smaller ones
+# aren't worth the process startup cost
+_PARALLEL_FILE_THRESHOLD = 4
+
+# Parser classes by file extension, imported on first use: loading all
+# four parser stacks (pypdf, python-pptx, python-docx, openpyxl)
+# eagerly adds seconds to Streamlit cold start even when a session only
+# ever ingests one format
+_PARSER_MODULES = {
+    "pdf": ("app.ingestion.pdf", "PDFParser"),
+    "pptx": ("app.ingestion.pptx", "PowerPointParser"),
+    "docx": ("app.ingestion.docx", "WordParser"),
+    "xlsx": ("app.ingestion.xlsx", "ExcelParser")
+}
+
+
+def _parse_one(file_path: str) -> Dict:
+    """
+    Parse and chunk a single file in a worker process
+
+    Top-level (rather than a method) so ProcessPoolExecutor can pickle
+    it; each worker reuses the module-level ingestion_tool created when
+    it imports this module
+
+    Args:
+        file_path: Path to the document file
+
+    Returns:
+        Result dictionary from parse_and_chunk()
+    """
+    return ingestion_tool.parse_and_chunk(file_path)
+
 
 class DocumentIngestionTool:
     """Tool for ingesting documents into the RAG system"""
 
+    # Per-request caps for the embeddings API (it rejects requests over
+    # 2048 inputs or ~300k tokens) and how many capped batches to keep
+    # in flight at once
+    EMBED_BATCH_MAX_INPUTS = 256
+    EMBED_BATCH_MAX_TOKENS = 250_000
+    EMBED_MAX_CONCURRENCY = 8
+
     def __init__(self):
-        """Initialize the ingestion tool with parsers and chunker"""
-        self.parsers = {
-            "pdf": PDFParser(),
-            "pptx": PowerPointParser(),
-            "docx": WordParser(),
-            "xlsx": ExcelParser()
-        }
+        """Initialize the ingestion tool with chunker and metadata"""
+        self._parsers = {}
+        self._openai_client = None
         self.chunker = TextChunker()
         self.metadata_extractor = MetadataExtractor()
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-    def ingest_document(self, file_path: str) -> Dict:
+    def _get_parser(self, file_type: str):
+        """Build (and cache) the parser for a file type on first use"""
+        parser = self._parsers.get(file_type)
+        if parser is None:
+            module_name, class_name = _PARSER_MODULES[file_type]
+            parser_cls = getattr(importlib.import_module(module_name), class_name)
+            parser = self._parsers[file_type] = parser_cls()
+        return parser
+
+    @property
+    def openai_client(self):
+        """Lazily built OpenAI client (opens an httpx pool eagerly)"""
+        if self._openai_client is None:
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._openai_client
+
+    def ingest_document(self, file_path: str, upload_timestamp: str = None) -> Dict:
         """
         Ingest a single document
 
         Args:
             file_path: Path to the document file
+            upload_timestamp: Optional shared timestamp for batch uploads
 
         Returns:
             Dictionary with ingestion results and statistics
         """
+        parsed = self.parse_and_chunk(file_path)
+
+        if not parsed.get("success"):
+            return parsed
+
+        return self._index_chunks(parsed, upload_timestamp=upload_timestamp)
+
+    def parse_and_chunk(self, file_path: str) -> Dict:
+        """
+        Parse a document and chunk its content (CPU-bound stage)
+
+        Split out from ingest_document so batch ingestion can run this
+        stage in worker processes while indexing stays in the main one
+
+        Args:
+            file_path: Path to the document file
+
+        Returns:
+            Dictionary with the chunked documents, or an error dictionary
+        """
         path = Path(file_path)
         file_type = path.suffix.lstrip('.').lower()
 
-        if file_type not in self.parsers:
+        if file_type not in _PARSER_MODULES:
             return {
                 "success": False,
                 "error": f"Unsupported file type: {file_type}",
@@ -56,9 +131,7 @@ class DocumentIngestionTool:
             }
 
         try:
-            # Step 1: Parse document
-            parser = self.parsers[file_type]
-            parsed_chunks = parser.parse(file_path)
+            parsed_chunks = self._parse_with_cache(file_path, file_type)
 
             if not parsed_chunks:
                 return {
@@ -67,11 +140,146 @@ class DocumentIngestionTool:
                     "file": path.name
                 }
 
-            # Step 2: Chunk the parsed content
-            chunked_documents = self.chunker.chunk_document(parsed_chunks)
+            return {
+                "success": True,
+                "file_path": file_path,
+                "file": path.name,
+                "file_type": file_type,
+                "chunks": self.chunker.chunk_document(parsed_chunks)
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file": path.name
+            }
+
+    def _parse_with_cache(self, file_path: str, file_type: str) -> List[Dict]:
+        """
+        Parse a document, reusing cached output for unchanged files
+
+        Parser output is cached on disk keyed by a hash of the file
+        bytes (plus the filename, so renamed copies don't collide), so
+        re-submitting an already-ingested file skips the XML/PDF parse
+        entirely - the dominant cost for XLSX and PPTX
+
+        Args:
+            file_path: Path to the document file
+            file_type: File extension (already validated)
+
+        Returns:
+            List of parsed chunk dictionaries
+        """
+        if not config.PARSE_CACHE_ENABLED:
+            return self._get_parser(file_type).parse(file_path)
+
+        path = Path(file_path)
+        content_hash = hashlib.blake2b(
+            path.read_bytes(), digest_size=16
+        ).hexdigest()
+
+        cache_dir = Path(config.PARSE_CACHE_PATH)
+        cache_file = cache_dir / f"{content_hash}_{path.name}.json"
+
+        if cache_file.exists():
+            try:
+                return json.loads(cache_file.read_text())
+            except Exception:
+                # Corrupt or truncated cache entry; fall through to a
+                # fresh parse that overwrites it
+                pass
+
+        parsed_chunks = self._get_parser(file_type).parse(file_path)
+
+        if parsed_chunks:
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                # Write-then-rename so concurrent workers never read a
+                # half-written entry
+                tmp_file = cache_file.with_suffix(".json.tmp")
+                tmp_file.write_text(json.dumps(parsed_chunks))
+                tmp_file.replace(cache_file)
+            except Exception:
+                # Cache is best-effort; a failed write never fails ingest
+                pass
+
+        return parsed_chunks
+
+    def _index_chunks(self, parsed: Dict, upload_timestamp: str = None) -> Dict:
+        """
+        Enrich, embed, and store already-chunked documents (I/O stage)
+
+        Args:
+            parsed: Successful result from parse_and_chunk()
+            upload_timestamp: Optional shared timestamp for batch uploads
+
+        Returns:
+            Dictionary with ingestion results and statistics
+        """
+        prepared = self._prepare_chunks(parsed, upload_timestamp=upload_timestamp)
+
+        if not prepared.get("success"):
+            return prepared
 
-            # Step 3: Enrich metadata
-            file_info = self.metadata_extractor.extract_file_info(file_path)
+        try:
+            embeddings = self._generate_embeddings(
+                prepared["texts"], token_counts=prepared["token_counts"]
+            )
+
+            chroma_client.add_chunks(
+                chunks=prepared["texts"],
+                metadatas=prepared["metadatas"],
+                ids=prepared["ids"],
+                embeddings=embeddings
+            )
+
+            return self._build_success_result(prepared)
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file": prepared["file"]
+            }
+
+    def _prepare_chunks(self, parsed: Dict, upload_timestamp: str = None) -> Dict:
+        """
+        Enrich chunk metadata and generate IDs for a parsed document
+
+        Args:
+            parsed: Successful result from parse_and_chunk()
+            upload_timestamp: Optional shared timestamp for batch uploads
+
+        Returns:
+            Dictionary with texts, metadatas, and ids ready for
+            embedding and storage, or an error dictionary
+        """
+        file_path = parsed["file_path"]
+        path = Path(file_path)
+        file_type = parsed["file_type"]
+        chunked_documents = parsed["chunks"]
+
+        # Drop chunks with nothing to embed - blank text and the
+        # parsers' error sentinels - before they spend embedding-batch
+        # slots, API tokens, and HNSW index rows
+        chunked_documents = [
+            chunk for chunk in chunked_documents
+            if chunk["text"] and chunk["text"].strip()
+            and chunk["metadata"].get("content_type") != "error"
+        ]
+
+        if not chunked_documents:
+            return {
+                "success": False,
+                "error": "No embeddable content",
+                "file": path.name
+            }
+
+        try:
+            file_info = self.metadata_extractor.extract_file_info(
+                file_path, upload_timestamp=upload_timestamp
+            )
             upload_timestamp = file_info["upload_timestamp"]
 
             for chunk in chunked_documents:
@@ -82,36 +290,30 @@ class DocumentIngestionTool:
                     upload_timestamp
                 )
 
-            # Step 4: Generate embeddings using OpenAI
             texts = [chunk["text"] for chunk in chunked_documents]
-            embeddings = self._generate_embeddings(texts)
 
-            # Step 5: Generate unique IDs
-            ids = []
-            for idx, chunk in enumerate(chunked_documents):
-                chunk_id = self.metadata_extractor.generate_chunk_id(
-                    path.name,
-                    chunk["metadata"].get("section", ""),
-                    idx
-                )
-                ids.append(chunk_id)
+            # Local binds keep the per-chunk cost to one call each:
+            # no repeated attribute walks inside the comprehension
+            generate_id = self.metadata_extractor.generate_chunk_id
+            filename = path.name
+            ids = [
+                generate_id(filename, chunk["metadata"].get("section", ""), idx)
+                for idx, chunk in enumerate(chunked_documents)
+            ]
 
-            # Step 6: Store in ChromaDB
-            metadatas = [chunk["metadata"] for chunk in chunked_documents]
-
-            chroma_client.add_chunks(
-                chunks=texts,
-                metadatas=metadatas,
-                ids=ids,
-                embeddings=embeddings
-            )
+            # Token counts were measured during chunking; reuse them
+            # instead of running the tokenizer a second time for stats
+            token_counts = [chunk["token_count"] for chunk in chunked_documents]
 
             return {
                 "success": True,
                 "file": path.name,
                 "file_type": file_type,
-                "chunks_created": len(chunked_documents),
-                "total_tokens": sum(self.chunker.count_tokens(text) for text in texts),
+                "texts": texts,
+                "metadatas": [chunk["metadata"] for chunk in chunked_documents],
+                "ids": ids,
+                "token_counts": token_counts,
+                "total_tokens": sum(token_counts),
                 "upload_timestamp": upload_timestamp
             }
 
@@ -122,29 +324,114 @@ class DocumentIngestionTool:
                 "file": path.name
             }
 
-    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    @staticmethod
+    def _build_success_result(prepared: Dict) -> Dict:
+        """Shape a prepared-file record into the public result dictionary"""
+        return {
+            "success": True,
+            "file": prepared["file"],
+            "file_type": prepared["file_type"],
+            "chunks_created": len(prepared["texts"]),
+            "total_tokens": prepared["total_tokens"],
+            "upload_timestamp": prepared["upload_timestamp"]
+        }
+
+    def _generate_embeddings(
+        self,
+        texts: List[str],
+        token_counts: List[int] = None
+    ) -> np.ndarray:
         """
         Generate embeddings for a list of texts using OpenAI
 
+        Inputs are split into batches that respect the API's per-request
+        caps (input count and total tokens), and multiple batches are
+        embedded concurrently so a large ingest overlaps its round-trips
+
         Args:
             texts: List of text strings to embed
+            token_counts: Optional per-text token counts measured during
+                          chunking (skips re-tokenizing for batch caps)
 
         Returns:
-            List of embedding vectors
+            Float32 embedding matrix, rows aligned with the input order
+        """
+        batches = self._build_embedding_batches(texts, token_counts)
+
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        # executor.map preserves batch order
+        workers = min(self.EMBED_MAX_CONCURRENCY, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self._embed_batch, batches))
+
+        return np.vstack(results)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
         """
-        # OpenAI's embedding model
-        model = "text-embedding-3-small"
+        Embed one size-capped batch in a single API call
+
+        Vectors are requested base64-encoded - roughly 25% less response
+        body than JSON float arrays - and decoded straight into float32
+        rows, skipping the per-float Python unboxing of the list path
+        (ChromaDB takes the ndarray as-is)
 
-        # Generate embeddings (batch for efficiency)
+        Rows are re-normalized to unit length before indexing: a no-op
+        for OpenAI embeddings (already unit-norm up to float precision)
+        that keeps inner-product distance (CHROMA_HNSW_SPACE=ip)
+        rank-equivalent to cosine
+        """
         response = self.openai_client.embeddings.create(
-            model=model,
-            input=texts
+            model="text-embedding-3-small",
+            input=texts,
+            encoding_format="base64"
         )
+        matrix = np.stack([
+            np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+            for item in response.data
+        ])
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        return matrix
+
+    def _build_embedding_batches(
+        self,
+        texts: List[str],
+        token_counts: List[int] = None
+    ) -> List[List[str]]:
+        """
+        Split texts into batches under the API's per-request limits
 
-        # Extract embeddings from response
-        embeddings = [item.embedding for item in response.data]
+        Args:
+            texts: List of text strings to embed
+            token_counts: Optional per-text token counts (falls back to
+                          tokenizing when not supplied)
+
+        Returns:
+            List of batches, each within the input-count and token caps
+        """
+        if token_counts is None:
+            token_counts = [self.chunker.count_tokens(text) for text in texts]
+
+        batches = []
+        current = []
+        current_tokens = 0
+
+        for text, tokens in zip(texts, token_counts):
+            if current and (
+                len(current) >= self.EMBED_BATCH_MAX_INPUTS
+                or current_tokens + tokens > self.EMBED_BATCH_MAX_TOKENS
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
 
-        return embeddings
+        return batches
 
     def ingest_multiple_documents(self, file_paths: List[str]) -> Dict:
         """
@@ -156,10 +443,71 @@ class DocumentIngestionTool:
         Returns:
             Dictionary with aggregated results
         """
-        results = []
-        for file_path in file_paths:
-            result = self.ingest_document(file_path)
-            results.append(result)
+        # One timestamp for the whole batch avoids per-file clock reads
+        # and ISO formatting
+        upload_timestamp = datetime.now().isoformat()
+
+        # The parse+chunk stage is GIL-bound pure Python (XML parsing,
+        # PDF extraction, tokenization), so large batches fan out across
+        # worker processes; indexing stays in the main process where the
+        # ChromaDB client and embedding session live
+        if len(file_paths) >= _PARALLEL_FILE_THRESHOLD:
+            workers = min(8, len(file_paths), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed_results = list(
+                    executor.map(_parse_one, file_paths, chunksize=4)
+                )
+        else:
+            parsed_results = [self.parse_and_chunk(p) for p in file_paths]
+
+        # Prepare every successfully parsed file, then embed and store
+        # the whole batch at once: chunks from all files share the same
+        # capped embedding batches and a single add_chunks call, instead
+        # of one embedding round-trip and one Chroma write per file
+        results = [None] * len(parsed_results)
+        prepared_files = []
+
+        for idx, parsed in enumerate(parsed_results):
+            if not parsed.get("success"):
+                results[idx] = parsed
+                continue
+
+            prepared = self._prepare_chunks(parsed, upload_timestamp=upload_timestamp)
+            if prepared.get("success"):
+                prepared_files.append((idx, prepared))
+            else:
+                results[idx] = prepared
+
+        if prepared_files:
+            try:
+                all_texts = [t for _, p in prepared_files for t in p["texts"]]
+                all_metadatas = [m for _, p in prepared_files for m in p["metadatas"]]
+                all_ids = [i for _, p in prepared_files for i in p["ids"]]
+                all_token_counts = [
+                    c for _, p in prepared_files for c in p["token_counts"]
+                ]
+
+                embeddings = self._generate_embeddings(
+                    all_texts, token_counts=all_token_counts
+                )
+
+                chroma_client.add_chunks(
+                    chunks=all_texts,
+                    metadatas=all_metadatas,
+                    ids=all_ids,
+                    embeddings=embeddings
+                )
+
+                for idx, prepared in prepared_files:
+                    results[idx] = self._build_success_result(prepared)
+
+            except Exception as e:
+                for idx, prepared in prepared_files:
+                    results[idx] = {
+                        "success": False,
+                        "error": str(e),
+                        "file": prepared["file"]
+                    }
 
         # Aggregate statistics
         successful = [r for r in results if r.get("success")]
@@ -3,61 +3,153 @@ Metadata Query Tool
 Provides information about indexed documents and database contents
 """
 
-from typing import List, Dict, Set
+import threading
+from typing import List, Dict, Optional
 from app.db.chroma import chroma_client
 
+# Constant row template, applied via C-level %-formatting; cheaper than
+# re-evaluating an f-string per file in the listing loop
+_FILE_ROW_TEMPLATE = (
+    "- %(filename)s (%(file_type)s) - %(chunk_count)d chunks - "
+    "Uploaded: %(upload_timestamp).10s"
+)
+
 
 class MetadataQueryTool:
     """Tool for querying document metadata and database information"""
 
+    # Rows per collection.get page; caps peak memory at one page of
+    # metadata instead of the whole collection per read
+    PAGE_SIZE = 512
+
     def __init__(self):
         """Initialize the metadata query tool"""
-        pass
+        # Per-file aggregates (file_type, upload_timestamp, chunk_count)
+        # maintained incrementally: ingests update it via the Chroma
+        # client's mutation listener, so reads never re-scan the
+        # collection after the first build
+        self._file_index: Dict[str, Dict] = {}
+        self._index_built = False
+        # Assembled list_indexed_files payload, reused verbatim until
+        # the collection mutates; retrieval's filter-selectivity check
+        # calls it on every filtered search, so rebuilding the per-file
+        # dicts each time is pure allocation churn
+        self._listing: Optional[Dict] = None
+        self._lock = threading.Lock()
+        chroma_client.register_listener(self._on_collection_change)
+
+    def _on_collection_change(self, event: str, metadatas: Optional[List[Dict]]):
+        """Keep the file index in sync with collection mutations"""
+        with self._lock:
+            self._listing = None
+            if event == "reset":
+                self._file_index.clear()
+                self._index_built = False
+            elif event == "add" and self._index_built:
+                self._apply_metadatas(metadatas or [])
+
+    def _apply_metadatas(self, metadatas: List[Dict]):
+        """Fold chunk metadatas into the per-file aggregates"""
+        for metadata in metadatas:
+            filename = metadata.get("filename", "Unknown")
+
+            info = self._file_index.get(filename)
+            if info is None:
+                info = self._file_index[filename] = {
+                    "filename": filename,
+                    "file_type": metadata.get("file_type", "unknown"),
+                    "upload_timestamp": metadata.get("upload_timestamp", "unknown"),
+                    "chunk_count": 0
+                }
 
-    def list_indexed_files(self) -> Dict:
-        """
-        List all files that have been indexed
+            info["chunk_count"] += 1
 
-        Returns:
-            Dictionary containing file information
+    def _ensure_index(self):
+        """Build the file index from Chroma once, in metadata-only pages"""
+        if self._index_built:
+            return
+
+        with self._lock:
+            if self._index_built:
+                return
+
+            # Prefer one SQL GROUP BY inside Chroma's SQLite store; the
+            # paged Python scan remains as the fallback when the store
+            # can't be read directly
+            aggregates = chroma_client.get_metadata_aggregates()
+            if aggregates is not None:
+                for info in aggregates:
+                    self._file_index[info["filename"]] = dict(info)
+            else:
+                collection = chroma_client.get_or_create_collection()
+
+                for metadatas in self._iter_metadata_pages(collection):
+                    self._apply_metadatas(metadatas)
+
+            self._index_built = True
+
+    def _iter_metadata_pages(self, collection, where: Dict = None):
         """
-        try:
-            collection = chroma_client.get_or_create_collection()
-            total_chunks = collection.count()
+        Yield the collection's metadatas one page at a time
 
-            if total_chunks == 0:
-                return {
-                    "success": True,
-                    "total_files": 0,
-                    "total_chunks": 0,
-                    "files": []
-                }
+        include=["metadatas"] keeps documents and embeddings (~6 KB per
+        chunk) from being serialized across the Chroma boundary just to
+        be thrown away
 
-            # Get all data from collection (up to a reasonable limit)
-            results = collection.get(limit=10000)  # Adjust limit as needed
-            metadatas = results.get("metadatas", [])
+        Args:
+            collection: ChromaDB collection to read
+            where: Optional metadata filter
 
-            # Extract unique filenames
-            files_info = {}
-            for metadata in metadatas:
-                filename = metadata.get("filename", "Unknown")
+        Yields:
+            Lists of metadata dictionaries, one page per iteration
+        """
+        offset = 0
+        while True:
+            page = collection.get(
+                where=where,
+                limit=self.PAGE_SIZE,
+                offset=offset,
+                include=["metadatas"]
+            )
+            metadatas = page.get("metadatas") or []
+            if not metadatas:
+                break
 
-                if filename not in files_info:
-                    files_info[filename] = {
-                        "filename": filename,
-                        "file_type": metadata.get("file_type", "unknown"),
-                        "upload_timestamp": metadata.get("upload_timestamp", "unknown"),
-                        "chunk_count": 0
-                    }
+            yield metadatas
+            offset += len(metadatas)
 
-                files_info[filename]["chunk_count"] += 1
+            if len(metadatas) < self.PAGE_SIZE:
+                break
 
-            return {
-                "success": True,
-                "total_files": len(files_info),
-                "total_chunks": total_chunks,
-                "files": list(files_info.values())
-            }
+    def list_indexed_files(self) -> Dict:
+        """
+        List all files that have been indexed
+
+        The same result object is handed out until the collection
+        mutates, so callers must treat it as read-only
+
+        Returns:
+            Dictionary containing file information
+        """
+        try:
+            self._ensure_index()
+
+            listing = self._listing
+            if listing is None:
+                with self._lock:
+                    listing = self._listing
+                    if listing is None:
+                        # One set of copies per collection version, so
+                        # callers still can't mutate the live aggregates
+                        files = [dict(info) for info in self._file_index.values()]
+                        listing = self._listing = {
+                            "success": True,
+                            "total_files": len(files),
+                            "total_chunks": sum(f["chunk_count"] for f in files),
+                            "files": files
+                        }
+
+            return listing
 
         except Exception as e:
             return {
@@ -78,36 +170,48 @@ class MetadataQueryTool:
         try:
             collection = chroma_client.get_or_create_collection()
 
-            # Query for chunks from this file
-            results = collection.get(
-                where={"filename": filename},
-                limit=10000
-            )
-
-            metadatas = results.get("metadatas", [])
-
-            if not metadatas:
+            # Aggregate page by page; only one page of this file's
+            # metadata is resident at a time, and only the section key
+            # is projected out of each row - file_type and timestamp
+            # are constant per file and read from the first row only.
+            # Sections dedupe through a dict, which keeps insertion
+            # order and sorts in place at the end without a set -> list
+            # -> sorted-copy round-trip
+            sections_seen = {}
+            file_type = "unknown"
+            upload_timestamp = "unknown"
+            chunk_count = 0
+
+            for metadatas in self._iter_metadata_pages(
+                collection, where={"filename": filename}
+            ):
+                if chunk_count == 0:
+                    file_type = metadatas[0].get("file_type", "unknown")
+                    upload_timestamp = metadatas[0].get("upload_timestamp", "unknown")
+
+                chunk_count += len(metadatas)
+                # One C-level dict update per page instead of a Python
+                # store per row
+                sections_seen.update(dict.fromkeys(
+                    metadata.get("section", "Unknown") for metadata in metadatas
+                ))
+
+            if chunk_count == 0:
                 return {
                     "success": False,
                     "error": f"File '{filename}' not found in database"
                 }
 
-            # Aggregate information
-            sections: Set[str] = set()
-            file_type = metadatas[0].get("file_type", "unknown")
-            upload_timestamp = metadatas[0].get("upload_timestamp", "unknown")
-
-            for metadata in metadatas:
-                section = metadata.get("section", "Unknown")
-                sections.add(section)
+            sections = list(sections_seen)
+            sections.sort()
 
             return {
                 "success": True,
                 "filename": filename,
                 "file_type": file_type,
                 "upload_timestamp": upload_timestamp,
-                "chunk_count": len(metadatas),
-                "sections": sorted(list(sections))
+                "chunk_count": chunk_count,
+                "sections": sections
             }
 
         except Exception as e:
@@ -124,16 +228,18 @@ class MetadataQueryTool:
             Dictionary with collection statistics
         """
         try:
-            collection = chroma_client.get_or_create_collection()
-            total_chunks = collection.count()
-
+            # Everything derives from the (cached) file listing: the
+            # old separate collection.count() repeated a SQL COUNT the
+            # listing's chunk totals already answer
             file_info = self.list_indexed_files()
 
             if not file_info.get("success"):
                 return file_info
 
-            # Count by file type
             files = file_info.get("files", [])
+            total_chunks = file_info.get("total_chunks", 0)
+
+            # Count by file type
             file_types = {}
             for file in files:
                 file_type = file.get("file_type", "unknown")
@@ -171,16 +277,12 @@ class MetadataQueryTool:
         if not files:
             return "No files have been indexed yet."
 
-        lines = [f"Total files indexed: {len(files)}\n"]
-
-        for file in files:
-            lines.append(
-                f"- {file['filename']} ({file['file_type']}) - "
-                f"{file['chunk_count']} chunks - "
-                f"Uploaded: {file['upload_timestamp'][:10]}"
-            )
-
-        return "\n".join(lines)
+        # join over a generator feeds rows straight into the C joiner;
+        # no intermediate list of lines
+        return "Total files indexed: %d\n\n%s" % (
+            len(files),
+            "\n".join(_FILE_ROW_TEMPLATE % file for file in files)
+        )
 
 
 # Global instance
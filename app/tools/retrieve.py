@@ -3,30 +3,134 @@ Retrieval Tool for Vector Search
 Searches the document database for relevant document chunks
 """
 
-import os
-from typing import List, Dict
-from openai import OpenAI
+import asyncio
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Dict
+import httpx
+import numpy as np
 from dotenv import load_dotenv
 
-from app.db.chroma import chroma_client
+from app.config import config
+from app.db.chroma import EmbeddingCache, chroma_client
 from app.ingestion.metadata import MetadataExtractor
+from app.tools.metadata import metadata_query_tool
 
 load_dotenv()
 
 
+@functools.cache
+def get_openai_client() -> "OpenAI":
+    """
+    Shared OpenAI client with a pooled httpx transport
+
+    One client per process means TCP + TLS connections are kept alive and
+    reused across all agent and tool calls instead of paying a handshake
+    per instantiation
+
+    The SDK import is deferred so a run configured for Ollama never pays
+    the openai import cost (and vice versa)
+    """
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=config.OPENAI_API_KEY,
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            timeout=60
+        )
+    )
+
+
 class RetrievalTool:
     """Tool for retrieving relevant document chunks from the database"""
 
-    def __init__(self):
-        """Initialize the retrieval tool"""
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    EMBEDDING_MODEL = "text-embedding-3-small"
+
+    # Distinct normalized queries kept in the in-process LRU tier
+    QUERY_CACHE_SIZE = 1024
+
+    # Cached retrieval results probed by embedding similarity
+    SEMANTIC_CACHE_SIZE = 256
+
+    # Exact-match retrieval results keyed by embedding hash + search
+    # parameters; agents re-issue identical retrievals inside reasoning
+    # loops, and a hit skips the ANN traversal and citation formatting
+    RESULT_CACHE_SIZE = 256
+
+    # Filters that keep at least this fraction of the collection are
+    # applied in Python over an over-fetched unfiltered search instead
+    # of as a Chroma pre-filter, and how much to over-fetch by
+    POST_FILTER_MIN_KEEP = 0.5
+    POST_FILTER_MULTIPLIER = 3
+
+    def __init__(self, similarity_threshold: float = 0.97):
+        """
+        Initialize the retrieval tool
+
+        Args:
+            similarity_threshold: Minimum cosine similarity between a
+                new query's embedding and a cached one for the cached
+                retrieval result to be reused
+        """
         self.metadata_extractor = MetadataExtractor()
+        self.similarity_threshold = similarity_threshold
+        # Two-tier query-embedding cache: an in-process LRU for repeat
+        # queries within a session, backed by the shared on-disk
+        # EmbeddingCache so hits survive restarts
+        self._query_cache: OrderedDict = OrderedDict()
+        self._disk_cache = EmbeddingCache()
+        # Semantic result cache: embeddings of past queries as an int8
+        # matrix plus their retrieval results, so paraphrases ("how does
+        # X work" vs "explain X") skip the Chroma query too. Rows are
+        # quantized per-vector to int8 - cosine is scale-invariant, so
+        # the per-row scale cancels out of the similarity - cutting the
+        # matrix to a quarter of its float32 size and letting numpy use
+        # integer SIMD kernels for the dot products
+        self._semantic_embeddings = None
+        self._semantic_norms = None
+        self._semantic_entries = []
+        # Exact result cache; both result tiers go stale the moment the
+        # collection mutates, so ingest/reset events clear them. The
+        # listener fires from ingestion worker threads and tool calls
+        # run on an executor, so every cache mutation takes this lock
+        self._result_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        chroma_client.register_listener(self._on_collection_change)
+
+    def _on_collection_change(self, event: str, metadatas) -> None:
+        """Drop cached results when the collection mutates"""
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Clear the cached retrieval results
+
+        Query-embedding caches survive - embeddings don't depend on the
+        collection's contents - but exact and semantic result entries
+        would return pre-mutation chunks, so both tiers are dropped
+        """
+        with self._cache_lock:
+            self._result_cache.clear()
+            self._semantic_embeddings = None
+            self._semantic_norms = None
+            self._semantic_entries = []
+
+    @property
+    def openai_client(self):
+        """Process-wide OpenAI client, shared with the agent"""
+        return get_openai_client()
 
     def retrieve(
         self,
         query: str,
         n_results: int = 5,
-        filter_metadata: Dict = None
+        filter_metadata: Dict = None,
+        query_embedding: List[float] = None,
+        include_documents: bool = True,
+        return_embeddings: bool = False
     ) -> Dict:
         """
         Retrieve relevant chunks for a query
@@ -35,45 +139,166 @@ class RetrievalTool:
             query: The search query
             n_results: Number of results to return
             filter_metadata: Optional metadata filters (e.g., {"file_type": "pdf"})
+            query_embedding: Optional pre-computed embedding for the query,
+                             avoiding a second embedding API call
+            include_documents: When False, skip returning chunk text -
+                               callers that only need citations avoid
+                               shipping documents out of Chroma
+            return_embeddings: When True, also return the candidate chunk
+                               embeddings as a float32 matrix, ready for
+                               a vectorized rerank (e.g. MMR) without a
+                               second Chroma round-trip
 
         Returns:
             Dictionary containing:
-            - chunks: List of relevant text chunks
+            - chunks: List of relevant text chunks (empty when
+              include_documents is False)
             - metadatas: List of metadata for each chunk
             - citations: List of formatted citations
-            - distances: Similarity scores
+            - distances: Similarity scores as a float32 numpy array, so
+              downstream threshold filters and rerankers run vectorized
+            - embeddings: Candidate embedding matrix (only when
+              return_embeddings is True)
         """
         try:
-            # Generate embedding for the query
-            query_embedding = self._generate_query_embedding(query)
+            # Generate embedding for the query unless one was supplied
+            if query_embedding is None:
+                query_embedding = self._generate_query_embedding(query)
+
+            context_key = (
+                n_results, repr(filter_metadata),
+                include_documents, return_embeddings
+            )
+
+            # Exact repeat of a past retrieval (same embedding, same
+            # search parameters): return its result outright
+            result_key = (
+                hashlib.blake2b(
+                    np.asarray(query_embedding, dtype=np.float32).tobytes(),
+                    digest_size=16
+                ).digest(),
+                context_key
+            )
+            with self._cache_lock:
+                cached = self._result_cache.get(result_key)
+                if cached is not None:
+                    self._result_cache.move_to_end(result_key)
+            if cached is not None:
+                result = dict(cached)
+                result["query"] = query
+                return result
+
+            # A near-identical past query (by embedding cosine) returns
+            # its cached retrieval result without touching Chroma
+            cached = self._semantic_lookup(query_embedding, context_key)
+            if cached is not None:
+                result = dict(cached)
+                result["query"] = query
+                return result
+
+            # Unselective filters (most of the collection matches) are
+            # cheaper as a Python post-filter over an over-fetched
+            # unfiltered search than as a Chroma pre-filter, which first
+            # materializes the whole allowed-ID set; selective filters
+            # stay pushed down as a where clause
+            post_filter = False
+            if filter_metadata:
+                keep_fraction = self._estimate_filter_selectivity(filter_metadata)
+                post_filter = (
+                    keep_fraction is not None
+                    and keep_fraction >= self.POST_FILTER_MIN_KEEP
+                )
+
+            # Only spell out an include list when deviating from
+            # Chroma's default of documents + metadatas + distances
+            include = None
+            if not include_documents or return_embeddings:
+                include = ["metadatas", "distances"]
+                if include_documents:
+                    include.append("documents")
+                if return_embeddings:
+                    include.append("embeddings")
 
             # Search ChromaDB
             results = chroma_client.query_with_embeddings(
                 query_embeddings=[query_embedding],
-                n_results=n_results,
-                where=filter_metadata
+                n_results=n_results * self.POST_FILTER_MULTIPLIER
+                if post_filter else n_results,
+                where=None if post_filter else filter_metadata,
+                include=include
             )
 
-            # Extract results
-            documents = results.get("documents", [[]])[0]
-            metadatas = results.get("metadatas", [[]])[0]
-            distances = results.get("distances", [[]])[0]
+            # Extract results (excluded fields come back as None);
+            # distances go straight to a float32 array so downstream
+            # similarity math stays in numpy
+            documents = (results.get("documents") or [[]])[0]
+            metadatas = (results.get("metadatas") or [[]])[0]
+            distances = np.asarray(
+                (results.get("distances") or [[]])[0], dtype=np.float32
+            )
+            embeddings = None
+            if return_embeddings:
+                embeddings = np.asarray(
+                    (results.get("embeddings") or [[]])[0], dtype=np.float32
+                )
+
+            if post_filter:
+                keep = [
+                    index for index, metadata in enumerate(metadatas)
+                    if all(
+                        metadata.get(key) == value
+                        for key, value in filter_metadata.items()
+                    )
+                ][:n_results]
+                documents = [documents[index] for index in keep] if documents else []
+                metadatas = [metadatas[index] for index in keep]
+                distances = distances[keep] if distances.size else distances
+                if embeddings is not None and embeddings.size:
+                    embeddings = embeddings[keep]
+
+                if len(metadatas) < n_results:
+                    # The over-fetch window can miss matches a pushed-down
+                    # filter would find; when it comes up short, pay for
+                    # the pre-filtered query after all
+                    results = chroma_client.query_with_embeddings(
+                        query_embeddings=[query_embedding],
+                        n_results=n_results,
+                        where=filter_metadata,
+                        include=include
+                    )
+                    documents = (results.get("documents") or [[]])[0]
+                    metadatas = (results.get("metadatas") or [[]])[0]
+                    distances = np.asarray(
+                        (results.get("distances") or [[]])[0], dtype=np.float32
+                    )
+                    if return_embeddings:
+                        embeddings = np.asarray(
+                            (results.get("embeddings") or [[]])[0], dtype=np.float32
+                        )
 
             # Generate citations
-            citations = [
-                self.metadata_extractor.create_citation(metadata)
-                for metadata in metadatas
-            ]
+            citations = self.metadata_extractor.create_citations(metadatas)
 
-            return {
+            result = {
                 "success": True,
                 "query": query,
                 "chunks": documents,
                 "metadatas": metadatas,
                 "citations": citations,
                 "distances": distances,
-                "num_results": len(documents)
+                "num_results": len(metadatas)
             }
+            if return_embeddings:
+                result["embeddings"] = embeddings
+
+            with self._cache_lock:
+                self._result_cache[result_key] = result
+                if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+
+            self._semantic_store(query_embedding, context_key, result)
+
+            return result
 
         except Exception as e:
             return {
@@ -82,53 +307,400 @@ class RetrievalTool:
                 "query": query
             }
 
+    async def aretrieve(
+        self,
+        query: str,
+        n_results: int = 5,
+        filter_metadata: Dict = None,
+        query_embedding: List[float] = None,
+        include_documents: bool = True,
+        return_embeddings: bool = False
+    ) -> Dict:
+        """
+        Async variant of retrieve(), run in a worker thread
+
+        Lets an event loop overlap several retrievals - gathering
+        aretrieve calls runs their embedding round-trips concurrently
+        instead of serially blocking on each
+
+        Args:
+            Same as retrieve()
+
+        Returns:
+            Same dictionary shape as retrieve()
+        """
+        return await asyncio.to_thread(
+            self.retrieve,
+            query,
+            n_results,
+            filter_metadata,
+            query_embedding,
+            include_documents,
+            return_embeddings
+        )
+
+    async def aretrieve_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter_metadata: Dict = None
+    ) -> List[Dict]:
+        """
+        Async variant of retrieve_batch(), run in a worker thread
+
+        Args:
+            Same as retrieve_batch()
+
+        Returns:
+            Same list shape as retrieve_batch()
+        """
+        return await asyncio.to_thread(
+            self.retrieve_batch, queries, n_results, filter_metadata
+        )
+
+    def _estimate_filter_selectivity(self, filter_metadata: Dict):
+        """
+        Estimate the fraction of chunks a metadata filter keeps
+
+        Uses the metadata tool's per-file aggregates, so the estimate is
+        a dict walk rather than a Chroma scan; filters on fields the
+        aggregates don't cover return None (caller pushes those down)
+
+        Args:
+            filter_metadata: The filter passed to retrieve()
+
+        Returns:
+            Fraction in [0, 1], or None when it can't be estimated
+        """
+        try:
+            listing = metadata_query_tool.list_indexed_files()
+            total_chunks = listing.get("total_chunks", 0)
+            if not listing.get("success") or not total_chunks:
+                return None
+
+            files = listing["files"]
+            keys = set(filter_metadata)
+
+            if keys == {"filename"}:
+                target = filter_metadata["filename"]
+                matched = sum(
+                    f["chunk_count"] for f in files if f["filename"] == target
+                )
+            elif keys == {"file_type"}:
+                target = filter_metadata["file_type"]
+                matched = sum(
+                    f["chunk_count"] for f in files if f["file_type"] == target
+                )
+            else:
+                return None
+
+            return matched / total_chunks
+
+        except Exception:
+            return None
+
+    def _semantic_lookup(self, query_embedding, context_key) -> Dict:
+        """
+        Find a cached retrieval result for a near-duplicate query
+
+        One matrix-vector product scores the new embedding against every
+        cached one; the best entry above the similarity threshold (with
+        the same n_results and filter) is returned
+
+        Args:
+            query_embedding: Embedding of the incoming query
+            context_key: (n_results, filter) tuple the result must match
+
+        Returns:
+            Cached result dictionary, or None on miss
+        """
+        quantized = self._quantize_int8(
+            np.asarray(query_embedding, dtype=np.float32)
+        )
+        quantized_norm = np.linalg.norm(quantized.astype(np.float32))
+        if quantized_norm == 0:
+            return None
+
+        with self._cache_lock:
+            if not self._semantic_entries:
+                return None
+
+            # int32 matrix-vector product over the quantized rows; the
+            # per-vector quantization scales cancel in the cosine ratio
+            similarities = (
+                self._semantic_embeddings.astype(np.int32) @ quantized.astype(np.int32)
+            ) / (self._semantic_norms * quantized_norm)
+
+            best_index = None
+            best_similarity = self.similarity_threshold
+            for index, (entry_key, _) in enumerate(self._semantic_entries):
+                if entry_key == context_key and similarities[index] > best_similarity:
+                    best_similarity = similarities[index]
+                    best_index = index
+
+            if best_index is None:
+                return None
+            return self._semantic_entries[best_index][1]
+
+    @staticmethod
+    def _quantize_int8(vector: np.ndarray) -> np.ndarray:
+        """Symmetric per-vector int8 quantization (scale = 127/absmax)"""
+        scale = 127.0 / (np.abs(vector).max() + 1e-12)
+        return np.round(vector * scale).astype(np.int8)
+
+    def _semantic_store(self, query_embedding, context_key, result: Dict):
+        """Remember a retrieval result for future near-duplicate hits"""
+        quantized = self._quantize_int8(
+            np.asarray(query_embedding, dtype=np.float32)
+        ).reshape(1, -1)
+
+        with self._cache_lock:
+            if self._semantic_embeddings is None:
+                self._semantic_embeddings = quantized
+            else:
+                self._semantic_embeddings = np.vstack(
+                    [self._semantic_embeddings, quantized]
+                )
+            self._semantic_norms = np.linalg.norm(
+                self._semantic_embeddings.astype(np.float32), axis=1
+            )
+            self._semantic_entries.append((context_key, result))
+
+            if len(self._semantic_entries) > self.SEMANTIC_CACHE_SIZE:
+                # Drop the oldest entry; one row copy at cache capacity
+                self._semantic_embeddings = self._semantic_embeddings[1:]
+                self._semantic_norms = self._semantic_norms[1:]
+                del self._semantic_entries[0]
+
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter_metadata: Dict = None
+    ) -> List[Dict]:
+        """
+        Retrieve relevant chunks for several queries in one round-trip
+
+        All queries are embedded in a single API call and searched with a
+        single batched ChromaDB query, instead of paying one embedding +
+        search round-trip per query
+
+        Args:
+            queries: List of search queries
+            n_results: Number of results to return per query
+            filter_metadata: Optional metadata filters (e.g., {"file_type": "pdf"})
+
+        Returns:
+            List of result dictionaries, one per query, in input order
+            (same shape as retrieve())
+        """
+        try:
+            # Embed all queries at once, skipping any already cached
+            query_embeddings = self._generate_query_embeddings_batch(queries)
+
+            # Single batched ChromaDB query
+            results = chroma_client.query_with_embeddings(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=filter_metadata
+            )
+
+            # Distribute per-query results back into retrieve()-shaped dicts
+            batch_results = []
+            for idx, query in enumerate(queries):
+                documents = results.get("documents", [[]])[idx]
+                metadatas = results.get("metadatas", [[]])[idx]
+                distances = np.asarray(
+                    results.get("distances", [[]])[idx], dtype=np.float32
+                )
+
+                citations = self.metadata_extractor.create_citations(metadatas)
+
+                batch_results.append({
+                    "success": True,
+                    "query": query,
+                    "chunks": documents,
+                    "metadatas": metadatas,
+                    "citations": citations,
+                    "distances": distances,
+                    "num_results": len(documents)
+                })
+
+            return batch_results
+
+        except Exception as e:
+            return [
+                {
+                    "success": False,
+                    "error": str(e),
+                    "query": query
+                }
+                for query in queries
+            ]
+
     def _generate_query_embedding(self, query: str) -> List[float]:
         """
         Generate embedding for a query using OpenAI
 
+        Repeat queries are served from cache - the embedding round-trip
+        dominates retrieval latency, so a hit saves a full HTTPS call.
+        Keys are hashes of the normalized (stripped, lowercased) query
+
         Args:
             query: Query text
 
         Returns:
             Embedding vector
         """
-        model = "text-embedding-3-small"
+        key = self._cache_key(query)
+
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            self._query_cache.move_to_end(key)
+            return cached
+
+        disk_hits = self._disk_cache.get_many(self.EMBEDDING_MODEL, [key])
+        if key in disk_hits:
+            embedding = disk_hits[key].tolist()
+        else:
+            response = self.openai_client.embeddings.create(
+                model=self.EMBEDDING_MODEL,
+                input=query
+            )
+            embedding = self._normalize(response.data[0].embedding)
+            self._disk_cache.set_many(
+                self.EMBEDDING_MODEL,
+                {key: np.asarray(embedding, dtype=np.float32)}
+            )
 
-        response = self.openai_client.embeddings.create(
-            model=model,
-            input=query
-        )
+        self._remember_embedding(key, embedding)
 
-        return response.data[0].embedding
+        return embedding
 
-    def format_context_for_agent(self, retrieval_result: Dict) -> str:
+    @staticmethod
+    def _normalize(embedding: List[float]) -> List[float]:
         """
-        Format retrieval results as context for the agent
+        Defensively scale an embedding to unit length
+
+        OpenAI embeddings are already unit-norm up to float precision,
+        so this is effectively free - but it guarantees that queries
+        against an inner-product collection (CHROMA_HNSW_SPACE=ip) rank
+        identically to cosine
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector /= np.linalg.norm(vector) + 1e-12
+        return vector.tolist()
+
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        """Cache key from the normalized query text"""
+        return hashlib.sha1(query.strip().lower().encode()).hexdigest()
+
+    def _remember_embedding(self, key: str, embedding: List[float]):
+        """Insert an embedding into the LRU tier, evicting the oldest"""
+        self._query_cache[key] = embedding
+        if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+
+    def _generate_query_embeddings_batch(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed several queries, sending only cache misses to the API
+
+        Hits come from the LRU and disk tiers exactly as in the single
+        path; whatever remains goes out in one embeddings call, so N
+        sub-questions cost at most one round-trip
 
         Args:
-            retrieval_result: Result from retrieve()
+            queries: Query texts to embed
 
         Returns:
-            Formatted context string
+            Embedding vectors in input order
+        """
+        keys = [self._cache_key(query) for query in queries]
+        embeddings = [None] * len(queries)
+
+        missing = []
+        for index, key in enumerate(keys):
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+                embeddings[index] = cached
+            else:
+                missing.append(index)
+
+        if missing:
+            disk_hits = self._disk_cache.get_many(
+                self.EMBEDDING_MODEL, [keys[index] for index in missing]
+            )
+
+            uncached = []
+            for index in missing:
+                hit = disk_hits.get(keys[index])
+                if hit is not None:
+                    embeddings[index] = hit.tolist()
+                    self._remember_embedding(keys[index], embeddings[index])
+                else:
+                    uncached.append(index)
+
+            if uncached:
+                response = self.openai_client.embeddings.create(
+                    model=self.EMBEDDING_MODEL,
+                    input=[queries[index] for index in uncached]
+                )
+
+                new_items = {}
+                for index, item in zip(uncached, response.data):
+                    embedding = self._normalize(item.embedding)
+                    embeddings[index] = embedding
+                    new_items[keys[index]] = np.asarray(
+                        embedding, dtype=np.float32
+                    )
+                    self._remember_embedding(keys[index], embedding)
+
+                self._disk_cache.set_many(self.EMBEDDING_MODEL, new_items)
+
+        return embeddings
+
+    def iter_context_for_agent(self, retrieval_result: Dict) -> Iterator[str]:
         """
-        if not retrieval_result.get("success"):
-            return "No relevant information found in the database."
+        Yield retrieval results as context pieces for the agent
+
+        The large chunk bodies are yielded by reference, never copied;
+        callers that assemble a prompt incrementally (or log pieces as
+        they go) can consume the iterator directly, and
+        format_context_for_agent joins it for everyone else
+
+        Args:
+            retrieval_result: Result from retrieve()
+
+        Yields:
+            Context string pieces, in output order
+        """
+        if not retrieval_result.get("success") or not retrieval_result["chunks"]:
+            yield "No relevant information found in the database."
+            return
 
         chunks = retrieval_result["chunks"]
         citations = retrieval_result["citations"]
 
-        if not chunks:
-            return "No relevant information found in the database."
-
-        # Build formatted context
-        context_parts = ["Retrieved information from documents:\n"]
+        yield "Retrieved information from documents:\n"
 
         for idx, (chunk, citation) in enumerate(zip(chunks, citations), 1):
-            context_parts.append(f"\n[Source {idx}: {citation}]")
-            context_parts.append(chunk)
-            context_parts.append("")
+            yield f"\n\n[Source {idx}: {citation}]\n"
+            yield chunk
+            yield "\n"
+
+    def format_context_for_agent(self, retrieval_result: Dict) -> str:
+        """
+        Format retrieval results as one context string for the agent
+
+        Args:
+            retrieval_result: Result from retrieve()
 
-        return "\n".join(context_parts)
+        Returns:
+            Formatted context string
+        """
+        return "".join(self.iter_context_for_agent(retrieval_result))
 
     def search_by_filename(self, filename: str, n_results: int = 10) -> Dict:
         """
@@ -141,25 +713,19 @@ class RetrievalTool:
         Returns:
             Dictionary with retrieval results
         """
-        # Use metadata filter for filename
-        filter_metadata = {"filename": filename}
-
-        # Get collection and query without specific search text
-        # This will just return chunks from the file
+        # A metadata get, not a vector query: the old empty-string
+        # query spent an embedding round-trip and an ANN traversal to
+        # return effectively arbitrary chunks
         try:
-            results = chroma_client.query(
-                query_text="",
-                n_results=n_results,
-                where=filter_metadata
+            results = chroma_client.get_by_metadata(
+                where={"filename": filename},
+                limit=n_results
             )
 
-            documents = results.get("documents", [[]])[0]
-            metadatas = results.get("metadatas", [[]])[0]
+            documents = results.get("documents") or []
+            metadatas = results.get("metadatas") or []
 
-            citations = [
-                self.metadata_extractor.create_citation(metadata)
-                for metadata in metadatas
-            ]
+            citations = self.metadata_extractor.create_citations(metadatas)
 
             return {
                 "success": True,